@@ -0,0 +1,219 @@
+import asyncio
+import fnmatch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium.common.exceptions import NoSuchElementException
+
+from element_waits import ElementWaiter
+
+SELENIUM = "selenium"
+PLAYWRIGHT = "playwright"
+ENGINES = (SELENIUM, PLAYWRIGHT)
+
+# Playwright resource types skipped when resource blocking is on
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+
+class SeleniumPage:
+    """
+    Browser page driven by a Selenium WebDriver, with explicit waits from an ElementWaiter.
+
+    Both page classes expose the same small API used by the UI tests: fill/clear an input,
+    wait for elements (each with `.text` and `.click()`), read and await the current URL.
+    """
+
+    def __init__(self, driver, waiter: ElementWaiter):
+        self.driver = driver
+        self.waiter = waiter
+
+    @property
+    def current_url(self) -> str:
+        return self.driver.current_url
+
+    def _input(self, xpath: str):
+        inputs = self.waiter.wait_for_elements(self.driver, xpath)
+        if not inputs:
+            raise NoSuchElementException(f"No element matches {xpath}")
+        return inputs[0]
+
+    def fill(self, xpath: str, text: str):
+        search_input = self._input(xpath)
+        search_input.clear()
+        search_input.send_keys(text)
+
+    def clear(self, xpath: str):
+        self._input(xpath).clear()
+
+    def elements(self, xpath: str, min_count: int = 1) -> list:
+        return self.waiter.wait_for_elements(self.driver, xpath, min_count)
+
+    def wait_for_url_change(self, old_url: str) -> bool:
+        return self.waiter.wait_for_url_change(self.driver, old_url)
+
+
+class SeleniumEngine:
+    """
+    Leases SeleniumPages backed by a WebDriverPool.
+    """
+
+    def __init__(self, pool, waiter: ElementWaiter):
+        self.pool = pool
+        self.waiter = waiter
+
+    @contextmanager
+    def lease(self):
+        with self.pool.lease() as driver:
+            yield SeleniumPage(driver, self.waiter)
+
+    def map(self, func, items) -> list:
+        return self.pool.map(lambda driver, item: func(SeleniumPage(driver, self.waiter), item), items)
+
+    def close(self):
+        pass
+
+
+class PlaywrightElement:
+    def __init__(self, engine: "PlaywrightEngine", locator):
+        self._engine = engine
+        self._locator = locator
+
+    @property
+    def text(self) -> str:
+        return self._engine.run(self._locator.inner_text())
+
+    def click(self):
+        self._engine.run(self._locator.click())
+
+
+class PlaywrightPage:
+    """
+    Browser page in its own Playwright browser context, using auto-waiting locators.
+    """
+
+    def __init__(self, engine: "PlaywrightEngine", page):
+        self._engine = engine
+        self.page = page
+
+    @property
+    def current_url(self) -> str:
+        return self.page.url
+
+    def _input(self, xpath: str):
+        locator = self.page.locator(f"xpath={xpath}").first
+        if not self.elements(xpath):
+            raise NoSuchElementException(f"No element matches {xpath}")
+        return locator
+
+    def fill(self, xpath: str, text: str):
+        self._engine.run(self._input(xpath).fill(text))
+
+    def clear(self, xpath: str):
+        self._engine.run(self._input(xpath).clear())
+
+    def elements(self, xpath: str, min_count: int = 1) -> list:
+        locator = self.page.locator(f"xpath={xpath}")
+        with self._engine.waiter.timed():
+            self._engine.run(self._engine.wait_for_count(locator, min_count))
+        count = self._engine.run(locator.count())
+        return [PlaywrightElement(self._engine, locator.nth(index)) for index in range(count)]
+
+    def wait_for_url_change(self, old_url: str) -> bool:
+        with self._engine.waiter.timed():
+            return self._engine.run(self._engine.wait_for_url_change(self.page, old_url))
+
+
+class PlaywrightEngine:
+    """
+    Runs every page in a lightweight browser context of a single headless Chromium.
+
+    Playwright's asyncio API runs on one background event loop; the synchronous page
+    methods submit coroutines to it, so pages leased from several threads (see `map`)
+    are driven concurrently by that single loop and browser process.
+    """
+
+    def __init__(self, size: int, start_url: str | None, waiter: ElementWaiter,
+                 blocked_resources: list[str] | None = None):
+        try:
+            from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+        except ImportError as e:
+            raise RuntimeError("The playwright engine needs `pip install playwright` "
+                               "and `playwright install chromium`") from e
+        self.size = size
+        self.start_url = start_url
+        self.waiter = waiter
+        self.blocked_resources = blocked_resources or []
+        self._timeout_error = PlaywrightTimeoutError
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="playwright", daemon=True)
+        self._thread.start()
+        self._playwright = self.run(async_playwright().start())
+        self._browser = self.run(self._playwright.chromium.launch(headless=True))
+        self._slots = threading.Semaphore(size)
+
+    def run(self, coro):
+        """
+        Run a coroutine on the Playwright event loop and wait for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _block(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or \
+                any(fnmatch.fnmatch(request.url, pattern) for pattern in self.blocked_resources):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _open(self):
+        context = await self._browser.new_context()
+        if self.blocked_resources:
+            await context.route("**/*", self._block)
+        page = await context.new_page()
+        page.set_default_timeout(self.waiter.timeout * 1000)
+        if self.start_url:
+            await page.goto(self.start_url)
+        return context, page
+
+    async def wait_for_count(self, locator, min_count: int):
+        try:
+            await locator.nth(min_count - 1).wait_for(state="attached", timeout=self.waiter.timeout * 1000)
+        except self._timeout_error:
+            pass  # like the Selenium waits, hand back whatever matched when the timeout expires
+
+    async def wait_for_url_change(self, page, old_url: str) -> bool:
+        try:
+            await page.wait_for_url(lambda url: url != old_url, timeout=self.waiter.timeout * 1000)
+            return True
+        except self._timeout_error:
+            return False
+
+    @contextmanager
+    def lease(self):
+        """
+        Open a fresh browser context on the start page for the duration of the `with` block.
+        """
+        with self._slots:
+            context, page = self.run(self._open())
+            try:
+                yield PlaywrightPage(self, page)
+            finally:
+                self.run(context.close())
+
+    def map(self, func, items) -> list:
+        """
+        Run `func(page, item)` for every item concurrently, each in its own browser context.
+        """
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="playwright") as executor:
+            def run(item):
+                with self.lease() as page:
+                    return func(page, item)
+
+            return list(executor.map(run, items))
+
+    def close(self):
+        self.run(self._browser.close())
+        self.run(self._playwright.stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -0,0 +1,370 @@
+import pytest
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from browser_engines import ENGINES, PLAYWRIGHT, SELENIUM, PlaywrightEngine, SeleniumEngine
+from element_waits import DEFAULT_POLL_FREQUENCY, DEFAULT_TIMEOUT, ElementWaiter
+from http_cassette import Cassette, LIVE, MODES, RECORD
+from http_timing import TimingRecorder
+from impact_selection import DEFAULT_TTL, OFF, POLICIES, ImpactPlugin
+from page_state import BLOCKED_RESOURCES, PageStateManager
+from pokeapi_cache import DEFAULT_CACHE_PATH, SQLiteStore
+from rate_limit import RateLimiter
+from stub_server import StubServer, create_app
+from webdriver_pool import WebDriverPool
+
+DEFAULT_CASSETTE = "cassettes/http.json.gz"
+# Default seed of the sampled Pokémon ids and generated pets, so recorded and replayed runs send
+# the same requests, and of the stand-in server fault injection
+RANDOM_SEED = 1234
+
+cassette_key = pytest.StashKey[Cassette]()
+timing_key = pytest.StashKey[TimingRecorder]()
+rate_limiter_key = pytest.StashKey[RateLimiter]()
+browser_pool_key = pytest.StashKey[WebDriverPool]()
+page_state_key = pytest.StashKey[PageStateManager]()
+element_waiter_key = pytest.StashKey[ElementWaiter]()
+impact_key = pytest.StashKey[ImpactPlugin]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("http", "HTTP test traffic")
+    group.addoption("--http-mode", choices=MODES, default=LIVE,
+                    help="live: hit the real endpoints (default), record: hit them and save a cassette, "
+                         "replay: serve responses from the cassette without network access")
+    group.addoption("--http-cassette", default=DEFAULT_CASSETTE,
+                    help=f"cassette file relative to the rootdir (default: {DEFAULT_CASSETTE})")
+    group.addoption("--http-timing", action="store_true",
+                    help="time every API call and print the slowest endpoints at the end of the run")
+    group.addoption("--http-timing-output",
+                    help="also write the per-call timings to this file (.csv or .json)")
+    group.addoption("--http-timing-top", type=int, default=10,
+                    help="number of endpoints shown in the slowest endpoints summary (default: 10)")
+    group.addoption("--rate-limit", type=float, default=None,
+                    help="client-side limit of API requests per second and host (default: unlimited)")
+    group.addoption("--rate-burst", type=int, default=1,
+                    help="API requests a host may receive at once within the rate limit (default: 1)")
+    group.addoption("--max-concurrency", type=int, default=None,
+                    help="upper bound of the adaptive number of concurrent API requests per host, "
+                         "halved on every 429/503 answer (default: unlimited)")
+    group.addoption("--stub-server", action="store_true",
+                    help="point the API suites at a local in-process Petstore/PokeAPI stand-in server")
+    group.addoption("--stub-latency", type=float, default=0.0,
+                    help="seconds of latency the stand-in server adds to every response")
+    group.addoption("--stub-error-rate", type=float, default=0.0,
+                    help="probability (0..1) that the stand-in server answers 503")
+
+    group = parser.getgroup("impact", "Test-impact selection")
+    group.addoption("--impact", choices=POLICIES, default=OFF,
+                    help="off: run every test in file order (default), order: run earlier failures, then new "
+                         "or changed tests, then the fastest ones first, skip: also skip the tests that passed "
+                         "and whose sources and external responses are unchanged")
+    group.addoption("--impact-ttl", type=float, default=DEFAULT_TTL,
+                    help=f"seconds a response of a live endpoint is trusted when deciding whether a test "
+                         f"is unchanged (default: {DEFAULT_TTL:.0f})")
+
+    group = parser.getgroup("pokeapi", "PokeAPI test data")
+    group.addoption("--pokeapi-cache", default=None,
+                    help=f"SQLite file caching the live PokeAPI responses across runs, e.g. {DEFAULT_CACHE_PATH} "
+                         f"(default: cached in memory for this run only)")
+    group.addoption("--pokemon-sample", type=int, default=9,
+                    help="number of Pokémon ids sampled for the name comparison tests (default: 9)")
+    group.addoption("--pokemon-seed", type=int, default=RANDOM_SEED,
+                    help=f"seed of the sampled ids, the same seed samples the same ids (default: {RANDOM_SEED})")
+
+    group = parser.getgroup("petstore", "Petstore test data")
+    group.addoption("--pet-dataset-size", type=int, default=0,
+                    help="number of generated pets loaded for the large dataset tests (default: 0, the tests are "
+                         "skipped on the public store and load 500 pets with --stub-server)")
+    group.addoption("--pet-seed", type=int, default=RANDOM_SEED,
+                    help=f"seed of the generated pets, the same seed yields the same pets (default: {RANDOM_SEED})")
+    group.addoption("--pet-results", default=None,
+                    help="SQLite file keeping every findByStatus result of the run for later diffs "
+                         "(default: in memory for this run only)")
+
+    group = parser.getgroup("browser", "Selenium browser pool")
+    group.addoption("--browser-engine", choices=ENGINES, default=SELENIUM,
+                    help="selenium: one headless Chrome per pooled browser (default), "
+                         "playwright: one Chromium process with a browser context per concurrent test")
+    group.addoption("--browsers", type=int, default=1,
+                    help="number of headless browsers launched up front and shared by the UI tests "
+                         "(per worker when running with pytest-xdist)")
+    group.addoption("--browser-profile-dir", default=None,
+                    help="keep the browser profiles (HTTP cache, cookies, service workers) in this directory "
+                         "and reuse them across runs, e.g. .cache/browser-profiles "
+                         "(default: a throwaway profile per browser)")
+    group.addoption("--block-resources", action="store_true",
+                    help="do not load images, fonts, ads and analytics in the browsers")
+    group.addoption("--wait-timeout", type=float, default=DEFAULT_TIMEOUT,
+                    help=f"seconds an explicit element wait may take (default: {DEFAULT_TIMEOUT})")
+    group.addoption("--wait-poll", type=float, default=DEFAULT_POLL_FREQUENCY,
+                    help=f"polling interval in seconds when a wait cannot observe the page "
+                         f"(default: {DEFAULT_POLL_FREQUENCY})")
+    group.addoption("--wait-budget", type=float, default=5.0,
+                    help="seconds of waiting per test above which it is flagged in the wait report (default: 5)")
+
+
+def pytest_configure(config):
+    if config.getoption("--impact") != OFF:
+        plugin = ImpactPlugin(config)
+        config.stash[impact_key] = plugin
+        config.pluginmanager.register(plugin, "impact")
+
+
+@pytest.fixture(scope="session")
+def http_cassette(request):
+    """
+    Session-wide cassette for --http-mode=record/replay, or None when running live.
+
+    Install it on a requests.Session with `http_cassette.install(session)`.
+    """
+    mode = request.config.getoption("--http-mode")
+    if mode == LIVE:
+        yield None
+        return
+    path = request.config.rootpath / request.config.getoption("--http-cassette")
+    cassette = Cassette(str(path), mode)
+    request.config.stash[cassette_key] = cassette
+    yield cassette
+    if mode == RECORD:
+        cassette.save()
+
+
+@pytest.fixture(scope="session")
+def http_timing(request):
+    """
+    Session-wide TimingRecorder with --http-timing, otherwise None.
+    """
+    if not request.config.getoption("--http-timing"):
+        yield None
+        return
+    recorder = TimingRecorder()
+    request.config.stash[timing_key] = recorder
+    yield recorder
+    output = request.config.getoption("--http-timing-output")
+    if output:
+        recorder.write(output)
+
+
+@pytest.fixture(scope="session")
+def element_waiter(request):
+    """
+    Session-wide ElementWaiter configured from --wait-timeout and --wait-poll.
+    """
+    waiter = ElementWaiter(request.config.getoption("--wait-timeout"), request.config.getoption("--wait-poll"))
+    request.config.stash[element_waiter_key] = waiter
+    return waiter
+
+
+@pytest.fixture(autouse=True)
+def tag_current_test(request, http_timing, element_waiter):
+    """
+    Tags the HTTP calls and element waits of each test with its node id.
+    """
+    for recorder in (http_timing, element_waiter):
+        if recorder:
+            recorder.current_test = request.node.nodeid
+    yield
+    for recorder in (http_timing, element_waiter):
+        if recorder:
+            recorder.current_test = None
+
+
+@pytest.fixture(scope="session")
+def rate_limiter(request):
+    """
+    Session-wide RateLimiter shared by every API client with --rate-limit or --max-concurrency, otherwise None.
+    """
+    rate = request.config.getoption("--rate-limit")
+    max_concurrency = request.config.getoption("--max-concurrency")
+    if not rate and not max_concurrency:
+        return None
+    limiter = RateLimiter(rate, request.config.getoption("--rate-burst"), max_concurrency=max_concurrency)
+    request.config.stash[rate_limiter_key] = limiter
+    return limiter
+
+
+@pytest.fixture(scope="session")
+def impact_plugin(request):
+    """
+    The test-impact selection plugin with --impact=order/skip, otherwise None.
+
+    Responses served without an HTTP session (e.g. from a ResponseCache) are reported to it with
+    `impact_plugin.observe_cached`.
+    """
+    return request.config.stash.get(impact_key, None)
+
+
+@pytest.fixture(scope="session")
+def configure_http_session(http_cassette, http_timing, rate_limiter, impact_plugin):
+    """
+    Function applying the active command line HTTP options (rate limit, cassette, timing, impact) to a
+    requests.Session.
+
+    The rate limiter is innermost, so replayed calls are never throttled.
+    """
+    def configure(session):
+        if rate_limiter:
+            rate_limiter.install(session)
+        if http_cassette:
+            http_cassette.install(session)
+        if http_timing:
+            http_timing.install(session)
+        if impact_plugin:
+            impact_plugin.install(session)
+        return session
+
+    return configure
+
+
+@pytest.fixture(scope="session")
+def pokeapi_response_store(request):
+    """
+    On-disk SQLiteStore backing the PokeAPI response cache with --pokeapi-cache, otherwise None.
+    """
+    path = request.config.getoption("--pokeapi-cache")
+    if not path:
+        yield None
+        return
+    store = SQLiteStore(path)
+    yield store
+    store.close()
+
+
+@pytest.fixture(scope="session")
+def stub_server(request):
+    """
+    Session-wide stand-in server started on a random port with --stub-server, otherwise None.
+
+    Use `stub_server.petstore_url` / `stub_server.pokeapi_url` as the API base URLs.
+    """
+    if not request.config.getoption("--stub-server"):
+        yield None
+        return
+    app = create_app(latency=request.config.getoption("--stub-latency"),
+                     error_rate=request.config.getoption("--stub-error-rate"),
+                     seed=RANDOM_SEED)
+    with StubServer(app) as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def browser_start_url():
+    """
+    Page every pooled browser is on when leased, override it in the test module.
+    """
+    return None
+
+
+@pytest.fixture(scope="session")
+def page_state(request, browser_start_url):
+    """
+    Session-wide PageStateManager keeping the pooled browsers warm.
+    """
+    manager = PageStateManager(
+        browser_start_url,
+        profile_root=request.config.getoption("--browser-profile-dir"),
+        blocked_resources=BLOCKED_RESOURCES if request.config.getoption("--block-resources") else None,
+    )
+    request.config.stash[page_state_key] = manager
+    return manager
+
+
+@pytest.fixture(scope="session")
+def webdriver_factory(page_state):
+    """
+    Callable launching headless Chrome number `worker` of the pool.
+    """
+    def launch(worker):
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")  # start Chrome in headless mode
+        chrome_options.add_argument("--no-sandbox")
+        for argument in page_state.chrome_arguments(worker):
+            chrome_options.add_argument(argument)
+        # No implicit wait, the tests wait explicitly through `element_waiter`
+        driver = webdriver.Chrome(chrome_options)
+        page_state.prepare(driver)
+        return driver
+
+    return launch
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request, webdriver_factory, browser_start_url, page_state):
+    """
+    Session-wide pool of --browsers pre-launched browsers, lease one with `browser_pool.lease()`.
+    """
+    pool = WebDriverPool(webdriver_factory, request.config.getoption("--browsers"), browser_start_url,
+                         restore=page_state.restore)
+    request.config.stash[browser_pool_key] = pool
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def browser_engine(request, browser_start_url, element_waiter):
+    """
+    Session-wide engine selected with --browser-engine, lease a page with `browser_engine.lease()`.
+    """
+    if request.config.getoption("--browser-engine") == PLAYWRIGHT:
+        blocked = BLOCKED_RESOURCES if request.config.getoption("--block-resources") else None
+        engine = PlaywrightEngine(request.config.getoption("--browsers"), browser_start_url, element_waiter,
+                                  blocked)
+    else:
+        engine = SeleniumEngine(request.getfixturevalue("browser_pool"), element_waiter)
+    yield engine
+    engine.close()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    impact = config.stash.get(impact_key, None)
+    if impact is not None:
+        terminalreporter.write_sep("-", "test impact")
+        for line in impact.summary():
+            terminalreporter.write_line(line)
+
+    cassette = config.stash.get(cassette_key, None)
+    if cassette is not None:
+        terminalreporter.write_sep("-", "http cassette")
+        for line in cassette.summary():
+            terminalreporter.write_line(line)
+
+    recorder = config.stash.get(timing_key, None)
+    if recorder is not None:
+        top = config.getoption("--http-timing-top")
+        terminalreporter.write_sep("-", f"slowest {top} endpoints")
+        for row in recorder.endpoints()[:top]:
+            terminalreporter.write_line(
+                f"{row['sum_ms']:10.1f} ms total {row['calls']:5d} calls  mean {row['mean_ms']:8.1f} ms  "
+                f"p95 {row['p95_ms']:8.1f} ms  max {row['max_ms']:8.1f} ms  {row['endpoint']}"
+            )
+
+    limiter = config.stash.get(rate_limiter_key, None)
+    if limiter is not None:
+        terminalreporter.write_sep("-", "client-side throttling")
+        for row in limiter.stats():
+            limit = row["concurrency_limit"]
+            terminalreporter.write_line(
+                f"{row['host']}: {row['requests']} requests, throttled {row['throttled_s']:.2f} s, "
+                f"{row['congested']} congestion signals"
+                + (f", concurrency limit {limit:.1f}" if limit is not None else "")
+            )
+
+    pool = config.stash.get(browser_pool_key, None)
+    if pool is not None:
+        terminalreporter.write_sep("-", "browser pool utilization")
+        for row in pool.utilization():
+            terminalreporter.write_line(
+                f"browser {row['worker']}: {row['leases']} leases, busy {row['busy_s']:.1f} s "
+                f"({row['utilization']:.0%}), {row['relaunches']} relaunches"
+            )
+        page_state = config.stash.get(page_state_key, None)
+        if page_state is not None:
+            terminalreporter.write_line(f"start page restored in place {page_state.in_place_resets} times, "
+                                        f"reloaded {page_state.reloads} times")
+
+    waiter = config.stash.get(element_waiter_key, None)
+    if waiter is not None and waiter.spent:
+        budget = config.getoption("--wait-budget")
+        terminalreporter.write_sep("-", f"element wait time (budget {budget:.1f} s per test)")
+        for test, spent, over_budget in waiter.report(budget):
+            terminalreporter.write_line(f"{spent:8.2f} s  {'OVER BUDGET ' if over_budget else ''}{test}")
@@ -0,0 +1,108 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_POLL_FREQUENCY = 0.1
+
+# Resolves as soon as the XPath matches enough nodes: checked once, then on every DOM mutation
+_OBSERVE_SCRIPT = """
+const [xpath, minCount, timeoutMs, done] = arguments;
+const count = () => document.evaluate(`count(${xpath})`, document, null,
+                                      XPathResult.NUMBER_TYPE, null).numberValue;
+if (count() >= minCount) {
+    done(true);
+    return;
+}
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (count() >= minCount) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(true);
+    }
+});
+observer.observe(document, {childList: true, subtree: true, characterData: true, attributes: true});
+timer = setTimeout(() => {
+    observer.disconnect();
+    done(false);
+}, timeoutMs);
+"""
+
+
+class ElementWaiter:
+    """
+    Explicit, event-driven waits for the UI tests.
+
+    Element waits run a MutationObserver inside the page, so they return as soon as the
+    DOM changes to match instead of sleeping through a fixed implicit wait. If the page
+    refuses scripts, waits fall back to polling every `poll_frequency` seconds.
+    Time spent waiting is accumulated per test in `spent`.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, poll_frequency: float = DEFAULT_POLL_FREQUENCY):
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.current_test = None
+        self.spent = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timed(self):
+        """
+        Count the time spent in the `with` block as waiting time of the current test.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.spent[self.current_test] = self.spent.get(self.current_test, 0.0) + \
+                    time.perf_counter() - started
+
+    def wait_for_elements(self, driver, xpath: str, min_count: int = 1, timeout: float | None = None) -> list:
+        """
+        Wait until at least `min_count` elements match `xpath`.
+
+        :return: The matching elements, possibly fewer than `min_count` if the wait timed out.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        with self.timed():
+            try:
+                driver.set_script_timeout(timeout + 1)
+                driver.execute_async_script(_OBSERVE_SCRIPT, xpath, min_count, int(timeout * 1000))
+            except (JavascriptException, TimeoutException):
+                self._poll(driver, lambda d: len(d.find_elements(By.XPATH, xpath)) >= min_count,
+                           max(timeout - (time.perf_counter() - started), 0))
+            return driver.find_elements(By.XPATH, xpath)
+
+    def wait_for_url_change(self, driver, old_url: str, timeout: float | None = None) -> bool:
+        """
+        Wait until the browser navigated away from `old_url`.
+
+        :return: True if the URL changed within the timeout.
+        """
+        with self.timed():
+            return self._poll(driver, EC.url_changes(old_url), self.timeout if timeout is None else timeout)
+
+    def _poll(self, driver, condition, timeout: float) -> bool:
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency,
+                          ignored_exceptions=(WebDriverException,)).until(condition)
+            return True
+        except TimeoutException:
+            return False
+
+    def report(self, budget: float) -> list[tuple[str, float, bool]]:
+        """
+        :return: (test, seconds spent waiting, over budget) rows, longest wait first.
+        """
+        with self._lock:
+            rows = sorted(self.spent.items(), key=lambda row: row[1], reverse=True)
+        return [(test, spent, spent > budget) for test, spent in rows]
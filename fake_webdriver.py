@@ -0,0 +1,39 @@
+from selenium.common.exceptions import WebDriverException
+
+
+class FakeDriver:
+    """
+    Minimal stand-in for a WebDriver, enough for the pool bookkeeping and the page state resets.
+    """
+
+    def __init__(self, worker: int = 0, current_url: str = "about:blank"):
+        self.worker = worker
+        self.current_url = current_url
+        self.window_handles = ["main"]
+        self.visits = []
+        self.scripts = []
+        self.cdp = []
+        self.broken = False
+        self.quit_called = False
+        self.switch_to = self
+
+    def window(self, handle):
+        pass
+
+    def close(self):
+        pass
+
+    def get(self, url):
+        if self.broken:
+            raise WebDriverException("browser crashed")
+        self.visits.append(url)
+        self.current_url = url
+
+    def execute_script(self, script):
+        self.scripts.append(script)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+
+    def quit(self):
+        self.quit_called = True
@@ -0,0 +1,160 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict, deque
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+RECORD = "record"
+REPLAY = "replay"
+LIVE = "live"
+MODES = (RECORD, REPLAY, LIVE)
+
+# The body is stored decoded, so transfer-level headers no longer describe it
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+class CassetteMissError(requests.RequestException):
+    """
+    Raised in replay mode when a request has no matching recorded interaction.
+    """
+
+
+def _request_key(request: requests.PreparedRequest) -> str:
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return f"{request.method} {request.url} {hashlib.sha1(body).hexdigest()}"
+
+
+def _encode_body(content: bytes) -> dict:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(body: dict) -> bytes:
+    if "text" in body:
+        return body["text"].encode("utf-8")
+    return base64.b64decode(body["base64"])
+
+
+class Cassette:
+    """
+    Gzip-compressed store of HTTP request/response pairs.
+
+    Requests are matched strictly on method, full URL and a hash of the body. Identical
+    requests are replayed in the order they were recorded, so a test that sends the same
+    request twice gets both recorded responses back.
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.recorded = []
+        self.missing = []
+        self._queues = defaultdict(deque)
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette {self.path} not found, record it first with --http-mode=record")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            interactions = json.load(f)["interactions"]
+        for interaction in interactions:
+            self._queues[interaction["key"]].append(interaction)
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump({"interactions": self.recorded}, f, separators=(",", ":"))
+
+    @property
+    def unused(self) -> list:
+        return [interaction["key"] for queue in self._queues.values() for interaction in queue]
+
+    def install(self, session: requests.Session):
+        """
+        Route every adapter mounted on `session` through this cassette.
+        """
+        for prefix, adapter in list(session.adapters.items()):
+            if not isinstance(adapter, CassetteAdapter):
+                session.mount(prefix, CassetteAdapter(self, adapter))
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response):
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        interaction = {
+            "key": _request_key(request),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": headers,
+            "body": _encode_body(response.content),
+        }
+        with self._lock:
+            self.recorded.append(interaction)
+
+    def play(self, request: requests.PreparedRequest, adapter: BaseAdapter) -> requests.Response:
+        key = _request_key(request)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                self.missing.append(key)
+                raise CassetteMissError(f"No recorded interaction for {request.method} {request.url}",
+                                        request=request)
+            interaction = queue.popleft()
+
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = _decode_body(interaction["body"])
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = adapter
+        return response
+
+    def summary(self) -> list:
+        """
+        :return: Human readable report lines about recorded, unused and missing interactions.
+        """
+        if self.mode == RECORD:
+            return [f"Recorded {len(self.recorded)} interactions to {self.path}"]
+        lines = [f"Cassette {self.path}: {len(self.unused)} unused, {len(self.missing)} missing interactions"]
+        lines += [f"  unused: {key}" for key in self.unused]
+        lines += [f"  missing: {key}" for key in self.missing]
+        return lines
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    Transport adapter that records through, or replays instead of, the wrapped adapter.
+    """
+
+    def __init__(self, cassette: Cassette, wrapped: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.wrapped = wrapped
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == REPLAY:
+            return self.cassette.play(request, self)
+        response = self.wrapped.send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def close(self):
+        self.wrapped.close()
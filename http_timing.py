@@ -0,0 +1,176 @@
+import csv
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+FIELDS = ("test", "method", "endpoint", "url", "status", "connect_ms", "tls_ms", "ttfb_ms", "total_ms")
+
+_local = threading.local()
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+
+def _add_phase(name: str, seconds: float):
+    phases = getattr(_local, "phases", None)
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+class _TimedConnectionMixin:
+    """
+    Records how long opening the socket (DNS lookup + TCP connect) and the whole
+    connection setup (including the TLS handshake) take for the call on this thread.
+    """
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        sock = super()._new_conn()
+        _add_phase("connect", time.perf_counter() - started)
+        return sock
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _add_phase("setup", time.perf_counter() - started)
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def endpoint_of(method: str, url: str) -> str:
+    """
+    Group key for a call: method, host and path with numeric segments replaced by {id}.
+    """
+    parts = urlsplit(url)
+    path = "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in parts.path.split("/"))
+    return f"{method} {parts.netloc}{path}"
+
+
+class TimingRecorder:
+    """
+    Collects per-call timings from every session it is installed on.
+
+    Each record holds the connect (DNS + TCP), TLS handshake, time to first byte and
+    total time in milliseconds, tagged with the endpoint and the running test.
+    Connect and TLS are 0 when a pooled connection was reused. For streamed responses
+    the total stops when the headers arrive, since the body is read by the caller.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.current_test = None
+        self._lock = threading.Lock()
+
+    def install(self, session: requests.Session):
+        """
+        Time every call made through `session`.
+        """
+        for prefix, adapter in list(session.adapters.items()):
+            if isinstance(adapter, TimingAdapter):
+                continue
+            inner = adapter
+            while not isinstance(inner, HTTPAdapter) and hasattr(inner, "wrapped"):
+                inner = inner.wrapped
+            if isinstance(inner, HTTPAdapter):
+                inner.poolmanager.pool_classes_by_scheme = {
+                    "http": TimedHTTPConnectionPool,
+                    "https": TimedHTTPSConnectionPool,
+                }
+            session.mount(prefix, TimingAdapter(self, adapter))
+
+    def add(self, record: dict):
+        with self._lock:
+            self.records.append(record)
+
+    def endpoints(self) -> list[dict]:
+        """
+        :return: Per-endpoint aggregates sorted by total time spent, slowest first.
+        """
+        grouped = {}
+        with self._lock:
+            for record in self.records:
+                grouped.setdefault(record["endpoint"], []).append(record["total_ms"])
+        summary = []
+        for endpoint, totals in grouped.items():
+            totals.sort()
+            summary.append({
+                "endpoint": endpoint,
+                "calls": len(totals),
+                "sum_ms": sum(totals),
+                "mean_ms": sum(totals) / len(totals),
+                "p95_ms": totals[min(len(totals) - 1, round(len(totals) * 0.95))],
+                "max_ms": totals[-1],
+            })
+        return sorted(summary, key=lambda row: row["sum_ms"], reverse=True)
+
+    def write(self, path: str):
+        """
+        Write the raw records as CSV when `path` ends with .csv, otherwise as JSON.
+        """
+        with self._lock:
+            records = list(self.records)
+        with open(path, "w", newline="") as f:
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(records)
+            else:
+                json.dump({"endpoints": self.endpoints(), "calls": records}, f, indent=2)
+
+
+class TimingAdapter(BaseAdapter):
+    """
+    Transport adapter timing the calls sent through the wrapped adapter.
+    """
+
+    def __init__(self, recorder: TimingRecorder, wrapped: BaseAdapter):
+        super().__init__()
+        self.recorder = recorder
+        self.wrapped = wrapped
+
+    def send(self, request, stream=False, **kwargs):
+        _local.phases = phases = {}
+        started = time.perf_counter()
+        try:
+            response = self.wrapped.send(request, stream=stream, **kwargs)
+            ttfb = time.perf_counter() - started
+            if not stream:
+                response.content  # read the body here so it counts towards the total
+            total = time.perf_counter() - started
+        finally:
+            _local.phases = None
+        connect = phases.get("connect", 0.0)
+        self.recorder.add({
+            "test": self.recorder.current_test,
+            "method": request.method,
+            "endpoint": endpoint_of(request.method, request.url),
+            "url": request.url,
+            "status": response.status_code,
+            "connect_ms": connect * 1000,
+            "tls_ms": max(phases.get("setup", 0.0) - connect, 0.0) * 1000,
+            "ttfb_ms": ttfb * 1000,
+            "total_ms": total * 1000,
+        })
+        return response
+
+    def close(self):
+        self.wrapped.close()
@@ -0,0 +1,325 @@
+import ast
+import hashlib
+import inspect
+import os
+import sys
+import threading
+import time
+import types
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+OFF = "off"
+ORDER = "order"
+SKIP = "skip"
+POLICIES = (OFF, ORDER, SKIP)
+CACHE_KEY = "test_impact/v1"  # entry of pytest's cache (.pytest_cache) holding the outcomes
+DEFAULT_TTL = 3600.0  # seconds a response seen from a live endpoint is trusted
+# Traffic to these hosts reaches the in-process stub server, whose behaviour is part of the sources
+LOOPBACK_HOSTS = {"127.0.0.1", "localhost", "::1"}
+# Command line options changing what the tests do, outcomes are only reused for the same values
+ENVIRONMENT_OPTIONS = ("http_mode", "http_cassette", "stub_server", "stub_latency", "stub_error_rate",
+                       "pokeapi_cache", "pokemon_sample", "pokemon_seed", "pet_dataset_size", "pet_seed",
+                       "browser_engine", "browsers", "browser_profile_dir", "block_resources",
+                       "wait_timeout")
+
+
+def fingerprint(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def _code_objects(code: types.CodeType):
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_objects(const)
+
+
+class SourceGraph:
+    """
+    Import graph of the project's Python files, read from their syntax trees without importing them.
+
+    Modules are matched by file name, as the suites import the flat modules of the
+    root and of petstore_swagger/ directly.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.modules = {}  # module name -> files
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in ("__pycache__", "venv")]
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    self.modules.setdefault(filename[:-3], []).append(os.path.join(dirpath, filename))
+        self._imports = {}
+        self._dependencies = {}
+        self._hashes = {}
+
+    def contains(self, path: str | None) -> bool:
+        return bool(path) and os.path.abspath(path).startswith(self.root + os.sep)
+
+    def relative(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def imports(self, path: str) -> set[str]:
+        """
+        Project files imported by the file at `path`.
+        """
+        if path not in self._imports:
+            try:
+                with open(path, "rb") as f:
+                    tree = ast.parse(f.read(), path)
+            except (OSError, SyntaxError, ValueError):
+                tree = ast.Module(body=[], type_ignores=[])
+            names = set()
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    names.update(part for alias in node.names for part in alias.name.split("."))
+                elif isinstance(node, ast.ImportFrom):
+                    names.update((node.module or "").split("."))
+                    names.update(alias.name for alias in node.names)  # 'from package import module'
+            self._imports[path] = {file for name in names for file in self.modules.get(name, ())} - {path}
+        return self._imports[path]
+
+    def dependencies(self, path: str) -> set[str]:
+        """
+        The file at `path` and every project file it imports, directly or not.
+        """
+        path = os.path.abspath(path)
+        if path not in self._dependencies:
+            seen, todo = {path}, [path]
+            while todo:
+                for imported in self.imports(todo.pop()) - seen:
+                    seen.add(imported)
+                    todo.append(imported)
+            self._dependencies[path] = seen
+        return self._dependencies[path]
+
+    def code_dependencies(self, func) -> set[str]:
+        """
+        Project files of `func` and of the modules, classes and functions it refers to by global name.
+        """
+        try:
+            files = {inspect.getsourcefile(func)}
+        except TypeError:  # not defined in Python source
+            return set()
+        namespace = getattr(func, "__globals__", {})
+        for code in _code_objects(func.__code__):
+            for name in code.co_names:
+                obj = namespace.get(name)
+                if obj is None:
+                    continue
+                module = obj if isinstance(obj, types.ModuleType) else sys.modules.get(getattr(obj, "__module__", None))
+                files.add(getattr(module, "__file__", None))
+        return set().union(*(self.dependencies(file) for file in files if self.contains(file)))
+
+    def file_hash(self, path: str) -> str | None:
+        """
+        Fingerprint of the content of the file, None if it does not exist. Computed once per run.
+        """
+        if path not in self._hashes:
+            try:
+                with open(path, "rb") as f:
+                    self._hashes[path] = fingerprint(f.read())
+            except OSError:
+                self._hashes[path] = None
+        return self._hashes[path]
+
+
+class ImpactPlugin:
+    """
+    Test-impact selection: skips or reorders tests from the outcomes of earlier runs.
+
+    Each test is mapped to the project files it depends on: the import graph of its
+    module and of the fixtures it uses. Each run stores every test's outcome with the
+    hashes of those files and a fingerprint of every response it received from an
+    external endpoint, of its status and ETag/Last-Modified when streamed, including
+    those served from a response cache. A passed test whose files are unchanged, and
+    whose responses were last fetched unchanged less than `--impact-ttl` seconds ago,
+    can be skipped. Replayed traffic only depends on the cassette file, so it never
+    expires. Tests that do run are ordered with the previous failures first, then new
+    or changed tests, then the fastest ones first. Without pytest's cache plugin
+    (-p no:cacheprovider) nothing is kept across runs.
+    """
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.policy = config.getoption("--impact")
+        self.ttl = config.getoption("--impact-ttl")
+        self.graph = SourceGraph(str(config.rootpath))
+        self.cache = getattr(config, "cache", None)
+        stored = self.cache.get(CACHE_KEY, {}) if self.cache is not None else {}
+        self.tests = stored.get("tests", {})  # node id -> outcome record of its last run
+        self.endpoints = stored.get("endpoints", {})  # 'METHOD url' -> [response fingerprint, seen at]
+        options = {name: getattr(config.option, name, None) for name in ENVIRONMENT_OPTIONS}
+        self.environment = fingerprint(repr(sorted(options.items())).encode())
+        self.cassette = None
+        if options["http_mode"] == "replay":
+            self.cassette = str(config.rootpath / options["http_cassette"])
+        self.current_test = None
+        self.skipped = set()
+        self.ran = 0
+        self._sources = {}  # node id -> {file: hash}
+        self._observed = {}  # node id -> {'METHOD url': response fingerprint}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def _test_sources(self, item: pytest.Item) -> dict:
+        files = set(self.graph.dependencies(str(item.path)))
+        # Closure of the fixtures of the test. Fixtures requested with request.getfixturevalue() are
+        # not part of it, the imports of the module defining the requesting fixture cover them
+        fixtureinfo = getattr(item, "_fixtureinfo", None)
+        for name in getattr(item, "fixturenames", ()):
+            for fixturedef in getattr(fixtureinfo, "name2fixturedefs", {}).get(name, ()):
+                files |= self.graph.code_dependencies(getattr(fixturedef, "func", None))
+        if self.cassette:
+            files.add(self.cassette)
+        return {self.graph.relative(file): self.graph.file_hash(file) for file in sorted(files)}
+
+    def _unchanged(self, nodeid: str) -> bool:
+        """
+        Whether the last outcome of the test is still valid for the current sources and endpoints.
+        """
+        record = self.tests.get(nodeid)
+        if record is None or record["outcome"] != "passed" or record["environment"] != self.environment:
+            return False
+        if record["sources"] != self._sources.get(nodeid):
+            return False
+        if self.cassette:
+            return True
+        now = time.time()
+        for key, response in record["endpoints"].items():
+            latest, seen_at = self.endpoints.get(key, (None, 0.0))
+            if latest != response or now - seen_at > self.ttl:
+                return False
+        return True
+
+    def _priority(self, item: pytest.Item) -> tuple:
+        record = self.tests.get(item.nodeid)
+        if record is None or record["environment"] != self.environment:
+            return 1, 0.0, 0.0
+        failure_rate = record["failures"] / record["runs"]
+        if record["outcome"] == "failed":
+            return 0, -failure_rate, record["duration"]
+        if self._unchanged(item.nodeid):
+            return 3, -failure_rate, record["duration"]
+        if record["sources"] != self._sources[item.nodeid]:
+            return 1, -failure_rate, record["duration"]
+        return 2, -failure_rate, record["duration"]
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items):
+        for item in items:
+            self._sources[item.nodeid] = self._test_sources(item)
+        items.sort(key=self._priority)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        self.current_test = item.nodeid
+        self._observed[item.nodeid] = {}
+        yield
+        self.current_test = None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        # Decided just before the test, so responses seen earlier in this run are taken into account
+        if self.policy == SKIP and self._unchanged(item.nodeid):
+            self.skipped.add(item.nodeid)
+            pytest.skip(f"unchanged since it passed ({CACHE_KEY}, --impact=skip)")
+
+    def pytest_runtest_call(self, item):
+        # Browser traffic is not visible to the HTTP sessions, only its target is known
+        start_url = item.funcargs.get("browser_start_url")
+        if start_url:
+            self.observe(f"BROWSER {start_url}", "")
+
+    def pytest_runtest_logreport(self, report):
+        if report.nodeid in self.skipped:
+            return
+        result = self._results.setdefault(report.nodeid, {"outcome": "passed", "duration": 0.0})
+        result["duration"] += report.duration
+        if report.failed:
+            result["outcome"] = "failed"
+        elif report.skipped and result["outcome"] == "passed":
+            result["outcome"] = "skipped"
+        if report.when == "teardown":
+            self._record(report.nodeid, self._results.pop(report.nodeid))
+
+    def _record(self, nodeid: str, result: dict):
+        self.ran += 1
+        previous = self.tests.get(nodeid, {})
+        self.tests[nodeid] = {
+            "outcome": result["outcome"],
+            "duration": result["duration"],
+            "runs": previous.get("runs", 0) + 1,
+            "failures": previous.get("failures", 0) + (result["outcome"] == "failed"),
+            "environment": self.environment,
+            "sources": self._sources.get(nodeid, {}),
+            "endpoints": self._observed.pop(nodeid, {}),
+            "finished_at": time.time(),
+        }
+
+    def pytest_sessionfinish(self):
+        if self.cache is not None:
+            self.cache.set(CACHE_KEY, {"tests": self.tests, "endpoints": self.endpoints})
+
+    def observe(self, key: str, response: str, seen_at: float | None = None):
+        """
+        Note the fingerprint of a response of an external endpoint received by the running test,
+        fetched at `seen_at` (default: now).
+        """
+        with self._lock:
+            self.endpoints[key] = [response, time.time() if seen_at is None else seen_at]
+            if self.current_test is not None:
+                self._observed.setdefault(self.current_test, {})[key] = response
+
+    def observe_cached(self, url: str, entry):
+        """
+        Note a response served from a ResponseCache (pokeapi_cache), use it as the cache's `on_hit`.
+
+        It is fingerprinted like the same response received from the network and dated from when
+        the cache fetched it, so a test served from the cache still expires with the TTL.
+        """
+        if urlsplit(url).hostname not in LOOPBACK_HOSTS:
+            self.observe(f"GET {url}", fingerprint(b"200" + entry.content), entry.fetched_at)
+
+    def install(self, session: requests.Session):
+        """
+        Fingerprint every external response received through `session`.
+        """
+        for prefix, adapter in list(session.adapters.items()):
+            if not isinstance(adapter, ImpactAdapter):
+                session.mount(prefix, ImpactAdapter(self, adapter))
+
+    def summary(self) -> list[str]:
+        return [f"{self.ran} tests run, {len(self.skipped)} skipped as unchanged since they passed "
+                f"(--impact={self.policy})"]
+
+
+class ImpactAdapter(BaseAdapter):
+    """
+    Transport adapter passing the responses of the wrapped adapter from external hosts to the impact plugin.
+    """
+
+    def __init__(self, plugin: ImpactPlugin, wrapped: BaseAdapter):
+        super().__init__()
+        self.plugin = plugin
+        self.wrapped = wrapped
+
+    def send(self, request, stream=False, **kwargs):
+        response = self.wrapped.send(request, stream=stream, **kwargs)
+        if urlsplit(request.url).hostname not in LOOPBACK_HOSTS:
+            if stream:
+                # The body is read later by the caller, the validators stand in for it
+                content = "|".join(response.headers.get(name, "") for name in ("ETag", "Last-Modified")).encode()
+            else:
+                content = response.content
+            self.plugin.observe(f"{request.method} {request.url}",
+                                fingerprint(str(response.status_code).encode() + content))
+        return response
+
+    def close(self):
+        self.wrapped.close()
@@ -0,0 +1,104 @@
+import os
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+# Files Chrome keeps in a profile while it is in use
+PROFILE_LOCKS = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+# Heavy resources that the search box tests never look at
+BLOCKED_RESOURCES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.mp4", "*.webm",
+    "*.woff", "*.woff2", "*.ttf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*adservice.google.*", "*connect.facebook.net*", "*hotjar.com*", "*clarity.ms*", "*tiktok.com*",
+]
+
+# Brings a page back to its freshly loaded state without reloading it: empties text inputs
+# (through the native setter so frameworks see the change), closes popups by blurring the
+# focused element and scrolls back to the top
+RESET_SCRIPT = """
+const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+for (const input of document.querySelectorAll('input[type=text], input[type=search], input:not([type])')) {
+    if (input.value) {
+        setValue.call(input, '');
+        input.dispatchEvent(new Event('input', {bubbles: true}));
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+}
+if (document.activeElement) {
+    document.activeElement.blur();
+}
+window.scrollTo(0, 0);
+"""
+
+
+class PageStateManager:
+    """
+    Keeps browsers warm between tests, and optionally between runs.
+
+    With a `profile_root`, every pooled browser gets its own persistent Chrome profile
+    there, so its HTTP cache, cookies and service workers survive across runs. Between tests
+    the start page is restored in place with RESET_SCRIPT when the browser is still on
+    it, and only reloaded when a test navigated away. Optionally, images, fonts, ads
+    and analytics are blocked through the DevTools protocol.
+    """
+
+    def __init__(self, start_url: str | None, profile_root: str | None = None,
+                 blocked_resources: list[str] | None = None, reset_script: str = RESET_SCRIPT):
+        """
+        :param start_url: Page the browsers are restored to.
+        :param profile_root: Directory holding one profile per browser, None for throwaway profiles.
+        :param blocked_resources: URL patterns ('*' wildcards) the browsers must not load.
+        :param reset_script: JavaScript restoring the start page in place.
+        """
+        self.start_url = start_url
+        self.profile_root = profile_root
+        self.blocked_resources = blocked_resources or []
+        self.reset_script = reset_script
+        self.reloads = 0
+        self.in_place_resets = 0
+        self._lock = threading.Lock()
+
+    def chrome_arguments(self, worker: int) -> list[str]:
+        """
+        Command line arguments giving browser `worker` its persistent profile.
+        """
+        if not self.profile_root:
+            return []
+        # Browsers of different pytest-xdist workers must not share a profile
+        name = f"{os.environ.get('PYTEST_XDIST_WORKER', 'main')}-{worker}"
+        profile = os.path.abspath(os.path.join(self.profile_root, name))
+        os.makedirs(profile, exist_ok=True)
+        # A crashed browser leaves its profile locked, which would make the relaunch fail
+        for lock in PROFILE_LOCKS:
+            path = os.path.join(profile, lock)
+            if os.path.lexists(path):
+                os.remove(path)
+        return [f"--user-data-dir={profile}"]
+
+    def prepare(self, driver):
+        """
+        Apply resource blocking to a freshly launched browser.
+        """
+        if self.blocked_resources:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_resources})
+
+    def restore(self, driver):
+        """
+        Bring `driver` back to the start page, in place when possible.
+        """
+        if not self.start_url:
+            return
+        if driver.current_url.rstrip("/") == self.start_url.rstrip("/"):
+            try:
+                driver.execute_script(self.reset_script)
+                with self._lock:
+                    self.in_place_resets += 1
+                return
+            except WebDriverException:
+                pass
+        driver.get(self.start_url)
+        with self._lock:
+            self.reloads += 1
@@ -0,0 +1,26 @@
+import pytest
+from petstore_factory import PetFactory
+from petstore_results import ResultStore
+from petstore_swagger import BASE_URL, PetstoreAPI
+
+
+@pytest.fixture(scope="session")
+def result_store(request):
+    # Every findByStatus result of the run, persisted across runs with --pet-results
+    store = ResultStore(request.config.getoption("--pet-results") or ":memory:")
+    yield store
+    store.close()
+
+
+@pytest.fixture(scope="session")
+def petstore_api(configure_http_session, stub_server, result_store):
+    # One pooled keep-alive session shared by the whole test session
+    with PetstoreAPI(stub_server.petstore_url if stub_server else BASE_URL, result_store=result_store) as api:
+        configure_http_session(api.session)
+        yield api
+
+
+@pytest.fixture(scope="session")
+def pet_factory(request):
+    # Deterministic pets with unique ids, so tests never share or depend on each other's pets
+    return PetFactory(seed=request.config.getoption("--pet-seed"))
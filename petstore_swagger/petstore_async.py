@@ -0,0 +1,134 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from petstore_swagger import PetstoreAPI, BASE_URL
+
+DEFAULT_CONCURRENCY = 20
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPetstoreAPI:
+    def __init__(self, base_url=BASE_URL, concurrency=DEFAULT_CONCURRENCY, **client_kwargs):
+        """
+        Asyncio front end for PetstoreAPI.
+
+        This is not a native asyncio client: every call runs the blocking PetstoreAPI method on
+        a dedicated thread pool sharing one pooled session, so at most `concurrency` requests are
+        in flight and each reuses a kept-alive connection. Every request in flight holds one
+        thread, a high `concurrency` costs a thread and a pooled connection per request, and a
+        cancelled call only stops being awaited, its request still runs to completion.
+
+        :param base_url: Root URL of the Petstore API.
+        :param concurrency: Maximum number of requests in flight at once.
+        :param client_kwargs: Extra arguments passed to PetstoreAPI (timeout, max_retries, ...).
+        """
+        self.concurrency = concurrency
+        client_kwargs.setdefault("pool_maxsize", concurrency)
+        self.client = PetstoreAPI(base_url, **client_kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="petstore")
+
+    async def _call(self, func, *args, **kwargs):
+        """
+        Run a blocking PetstoreAPI method on the client thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def aclose(self):
+        """
+        Shut down the thread pool and close the underlying session.
+        """
+        self._executor.shutdown(wait=True)
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def create_new_pet(self, pet_id, name, category, tags, timeout=None):
+        """
+        Create a new pet with the status 'available'.
+        """
+        return await self._call(self.client.create_new_pet, pet_id, name, category, tags, timeout=timeout)
+
+    async def update_pet_status(self, pet_id, status, timeout=None):
+        """
+        Update the status of an existing pet.
+        """
+        return await self._call(self.client.update_pet_status, pet_id, status, timeout=timeout)
+
+    async def find_pet_by_status(self, status, timeout=None):
+        """
+        Find pets by status.
+        """
+        return await self._call(self.client.find_pet_by_status, status, timeout=timeout)
+
+    async def _fan_out(self, coro_func, items, concurrency=None):
+        """
+        Run `coro_func(item)` for every item with at most `concurrency` calls pending
+        and yield results in completion order.
+
+        Items are pulled from the iterable lazily, so arbitrarily large inputs are never
+        materialized as tasks all at once. If a call fails the remaining calls are cancelled
+        and the exception is raised to the consumer.
+        """
+        limit = min(concurrency or self.concurrency, self.concurrency)
+        items = iter(items)
+        pending = set()
+
+        def schedule():
+            for item in items:
+                pending.add(asyncio.ensure_future(coro_func(item)))
+                if len(pending) >= limit:
+                    break
+
+        schedule()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.discard(task)
+                    yield task.result()
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def create_pets(self, pets, concurrency=None, timeout=None):
+        """
+        Create many pets concurrently and yield each created pet as soon as it is stored.
+
+        :param pets: Iterable of dicts with the create_new_pet arguments
+                     (pet_id, name, category, tags).
+        :param concurrency: Maximum number of creates in flight, capped by the client concurrency.
+        """
+        async def create(pet):
+            return await self.create_new_pet(timeout=timeout, **pet)
+
+        async for created in self._fan_out(create, pets, concurrency):
+            yield created
+
+    async def update_pets_status(self, pet_ids, status, concurrency=None, timeout=None):
+        """
+        Update the status of many pets concurrently and yield each updated pet as it completes.
+        """
+        async def update(pet_id):
+            return await self.update_pet_status(pet_id, status, timeout=timeout)
+
+        async for updated in self._fan_out(update, pet_ids, concurrency):
+            yield updated
+
+    async def find_pets_by_statuses(self, statuses, concurrency=None, timeout=None):
+        """
+        Query several statuses concurrently and yield (status, pets) pairs as each query completes.
+        """
+        async def find(status):
+            return status, await self.find_pet_by_status(status, timeout=timeout)
+
+        async for result in self._fan_out(find, statuses, concurrency):
+            yield result
@@ -0,0 +1,285 @@
+import argparse
+import itertools
+import json
+import logging
+import threading
+import time
+
+from petstore_contract import ContractValidator
+from petstore_swagger import PetstoreAPI, BASE_URL
+
+OPERATIONS = ("create", "update", "find", "workflow")
+PERCENTILES = (50, 95, 99)
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies in microseconds.
+
+    Values are bucketed by power of two, and every power of two is split into
+    `2 ** precision_bits` linear sub-buckets, giving a relative error below
+    1 / 2 ** precision_bits at a constant recording cost and a fixed memory footprint.
+    """
+
+    def __init__(self, precision_bits: int = 7):
+        self.precision_bits = precision_bits
+        self.sub_buckets = 1 << precision_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_buckets:
+            return value
+        shift = value.bit_length() - self.precision_bits - 1
+        return ((shift + 1) << self.precision_bits) + (value >> shift) - self.sub_buckets
+
+    def _lowest_value(self, index: int) -> int:
+        if index < self.sub_buckets:
+            return index
+        shift = (index >> self.precision_bits) - 1
+        return (self.sub_buckets + (index & (self.sub_buckets - 1))) << shift
+
+    def record(self, seconds: float):
+        value = max(int(seconds * 1_000_000), 0)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, percent: float) -> int:
+        """
+        :return: The latency in microseconds at or below which `percent` of the values fall.
+        """
+        if not self.count:
+            return 0
+        threshold = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self._lowest_value(index), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """
+        :return: Count, mean, min, max and percentiles in milliseconds plus the raw buckets.
+        """
+        summary = {
+            "count": self.count,
+            "mean_ms": self.total / self.count / 1000 if self.count else 0.0,
+            "min_ms": (self.min or 0) / 1000,
+            "max_ms": self.max / 1000,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}_ms"] = self.percentile(percent) / 1000
+        summary["buckets_us"] = {str(self._lowest_value(index)): count
+                                 for index, count in sorted(self.counts.items())}
+        return summary
+
+
+class _Worker:
+    """
+    Per-thread counters, merged once the run is over so recording needs no locking.
+    """
+
+    def __init__(self):
+        self.histograms = {operation: LatencyHistogram() for operation in OPERATIONS}
+        self.requests = 0
+        self.errors = 0
+        self.workflows = 0
+        self.pet_ids = []  # every pet id the worker tried to create
+
+
+class PetstoreBenchmark:
+    def __init__(self, api: PetstoreAPI, concurrency: int = 10, rps: float | None = None,
+                 duration: float = 10.0, first_pet_id: int = 9_000_000):
+        """
+        Load driver running create -> update status -> find by status workflows.
+
+        :param api: Client to drive, its pool should hold at least `concurrency` connections.
+        :param concurrency: Number of worker threads.
+        :param rps: Target workflow starts per second. When set, workflows are scheduled at a
+                    fixed rate and latency is measured from the scheduled start, so queueing
+                    behind a slow server is not hidden. When None, workers run back to back.
+        :param duration: Length of the run in seconds.
+        :param first_pet_id: First pet id used, every workflow creates a new pet. The pets
+                             are deleted once the run is over.
+        """
+        self.api = api
+        self.concurrency = concurrency
+        self.rps = rps
+        self.duration = duration
+        self._pet_ids = itertools.count(first_pet_id)
+        self._slots = itertools.count()
+
+    def _step(self, worker: _Worker, operation: str, check, call, *args):
+        started = time.perf_counter()
+        worker.requests += 1
+        try:
+            ok = check(call(*args))
+        except Exception as e:
+            logger.debug(f"{operation} failed: {e}")
+            ok = False
+        worker.histograms[operation].record(time.perf_counter() - started)
+        if not ok:
+            worker.errors += 1
+        return ok
+
+    def _workflow(self, worker: _Worker, started: float):
+        pet_id = next(self._pet_ids)
+        worker.pet_ids.append(pet_id)
+        ok = (self._step(worker, "create", lambda pet: pet.id == pet_id,
+                         self.api.create_new_pet, pet_id, f"Bench{pet_id}", "Benchmark", ["load"])
+              and self._step(worker, "update", lambda pet: pet.status == "sold",
+                             self.api.update_pet_status, pet_id, "sold")
+              and self._step(worker, "find", lambda pets: isinstance(pets, list),
+                             self.api.find_pet_by_status, "sold"))
+        if ok:
+            worker.histograms["workflow"].record(time.perf_counter() - started)
+            worker.workflows += 1
+
+    def _run_worker(self, worker: _Worker, start: float, deadline: float):
+        while True:
+            if self.rps:
+                scheduled = start + next(self._slots) / self.rps
+                if scheduled >= deadline:
+                    return
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self._workflow(worker, scheduled)
+            else:
+                now = time.perf_counter()
+                if now >= deadline:
+                    return
+                self._workflow(worker, now)
+
+    def run(self) -> dict:
+        """
+        Drive the load for the configured duration.
+
+        :return: Report with throughput, error rate and latency summaries per operation.
+        """
+        workers = [_Worker() for _ in range(self.concurrency)]
+        petstore_logger = logging.getLogger(PetstoreAPI.__module__)
+        level = petstore_logger.level
+        # Response bodies are logged at INFO on every call, far too costly under load
+        petstore_logger.setLevel(logging.WARNING)
+        start = time.perf_counter()
+        deadline = start + self.duration
+        threads = [threading.Thread(target=self._run_worker, args=(worker, start, deadline))
+                   for worker in workers]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            # Outside the measured time, so the store does not keep growing from run to run
+            try:
+                deleted = self.api.delete_pets(pet_id for worker in workers for pet_id in worker.pet_ids)
+            except Exception as e:
+                logger.warning(f"Deleting the benchmark pets failed: {e}")
+                deleted = None
+            petstore_logger.setLevel(level)
+
+        histograms = {operation: LatencyHistogram() for operation in OPERATIONS}
+        for worker in workers:
+            for operation, histogram in worker.histograms.items():
+                histograms[operation].merge(histogram)
+        requests_sent = sum(worker.requests for worker in workers)
+        errors = sum(worker.errors for worker in workers)
+        workflows = sum(worker.workflows for worker in workers)
+        return {
+            "base_url": self.api.base_url,
+            "concurrency": self.concurrency,
+            "target_rps": self.rps,
+            "duration_s": elapsed,
+            "workflows": workflows,
+            "requests": requests_sent,
+            "errors": errors,
+            "error_rate": errors / requests_sent if requests_sent else 0.0,
+            "workflows_per_s": workflows / elapsed,
+            "pets_deleted": deleted,
+            "requests_per_s": requests_sent / elapsed,
+            "latency": {operation: histogram.summary() for operation, histogram in histograms.items()},
+        }
+
+
+def compare_reports(baseline: dict, current: dict) -> dict:
+    """
+    Relative change of the headline metrics between two benchmark reports.
+
+    :return: Metric name -> change in percent (positive means the value went up).
+    """
+    def change(old, new):
+        return (new - old) / old * 100 if old else 0.0
+
+    deltas = {
+        "requests_per_s": change(baseline["requests_per_s"], current["requests_per_s"]),
+        "error_rate": (current["error_rate"] - baseline["error_rate"]) * 100,
+    }
+    for operation in OPERATIONS:
+        for percent in PERCENTILES:
+            key = f"p{percent}_ms"
+            deltas[f"{operation}_{key}"] = change(baseline["latency"][operation][key],
+                                                  current["latency"][operation][key])
+    return deltas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test a Petstore-compatible service")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rps", type=float, default=None, help="target workflows per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report of a previous run to compare against")
+    parser.add_argument("--validate-contract", action="store_true",
+                        help="check every request body and response against the Petstore spec")
+    args = parser.parse_args(argv)
+
+    contract = ContractValidator.load() if args.validate_contract else None
+    with PetstoreAPI(args.base_url, pool_maxsize=args.concurrency) as api:
+        if contract is not None:
+            contract.install(api.session)
+        report = PetstoreBenchmark(api, args.concurrency, args.rps, args.duration).run()
+    if contract is not None:
+        report["contract"] = {"checked": contract.checked, "violations": contract.violation_count,
+                              "first_violations": contract.violations[:10]}
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["change_vs_baseline_pct"] = compare_reports(json.load(f), report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    logger.info(f"{report['workflows']} workflows, {report['requests_per_s']:.1f} req/s, "
+                f"error rate {report['error_rate']:.2%}")
+    for operation, latency in report["latency"].items():
+        logger.info(f"{operation}: p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, "
+                    f"p99 {latency['p99_ms']:.1f} ms")
+    if contract is not None:
+        logger.info(f"Contract: {contract.violation_count} violations in {contract.checked} checked messages")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import functools
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Literal, Optional
+from urllib.parse import urlsplit
+
+import requests
+from pydantic import ConfigDict, TypeAdapter, ValidationError, create_model
+from requests.adapters import BaseAdapter
+
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "petstore_spec.json")
+# Operations of the spec that PetstoreAPI calls
+COVERED_OPERATIONS = ("addPet", "updatePet", "findPetsByStatus", "deletePet")
+MAX_VIOLATIONS = 100  # violations kept for the report, all of them are counted
+# Answers the Petstore service gives but its published spec (petstore_spec.json) does not declare,
+# compiled along with the declared ones: operation id -> status -> response
+UNDECLARED_RESPONSES = {
+    # The spec only declares 405, the store answers 200 with the stored pet
+    "addPet": {200: {"description": "successful operation", "schema": {"$ref": "#/definitions/Pet"}}},
+    # The spec only declares 400, 404 and 405, the store answers 200 with the updated pet
+    "updatePet": {200: {"description": "successful operation", "schema": {"$ref": "#/definitions/Pet"}}},
+    # The spec only declares 400 and 404, the store answers 200 with an ApiResponse naming the pet id
+    "deletePet": {200: {"description": "successful operation", "schema": {"$ref": "#/definitions/ApiResponse"}}},
+}
+
+_PRIMITIVES = {"integer": int, "number": float, "string": str, "boolean": bool}
+
+
+class ContractViolation(AssertionError):
+    pass
+
+
+@dataclass
+class Operation:
+    operation_id: str
+    method: str
+    path: str
+    pattern: re.Pattern
+    parameters: list
+    request: Optional[TypeAdapter]  # validator of the body parameter, None if the operation takes no body
+    responses: dict  # status code (int) or 'default' -> TypeAdapter, None for answers without a body
+
+
+@dataclass
+class ContractCase:
+    """
+    One generated request against an operation and the statuses the spec allows for it.
+    """
+    name: str
+    operation_id: str
+    method: str
+    path: str  # relative to the base path of the API
+    expected_statuses: set
+    params: dict = field(default_factory=dict)
+    body: Any = None
+    setup_pets: list = field(default_factory=list)  # pets stored before and deleted after the request
+
+
+class ContractValidator:
+    """
+    Swagger 2.0 contract of the Petstore, compiled once into pydantic validators.
+
+    Every definition becomes a pydantic model and every request body and declared response
+    schema a TypeAdapter, so validating a message is a single pass over its bytes in
+    pydantic's native code. Use `load()` to share one compiled validator per spec file.
+    """
+
+    def __init__(self, spec: dict, undeclared_responses: dict = UNDECLARED_RESPONSES):
+        """
+        :param spec: Swagger 2.0 document.
+        :param undeclared_responses: Answers of the service missing from the document, merged into its
+                                     operations (operation id -> status -> response).
+        """
+        self.spec = spec
+        self.base_path = spec.get("basePath", "").rstrip("/")
+        self._models = {}
+        self.operations = {}
+        for path, methods in spec["paths"].items():
+            pattern = re.compile("^" + re.sub(r"\\{[^}]+\\}", "[^/]+", re.escape(self.base_path + path)) + "$")
+            for method, operation in methods.items():
+                operation_id = operation["operationId"]
+                parameters = operation.get("parameters", [])
+                body = next((p for p in parameters if p["in"] == "body"), None)
+                responses = {status if status == "default" else int(status): response
+                             for status, response in operation["responses"].items()}
+                responses.update(undeclared_responses.get(operation_id, {}))
+                self.operations[operation_id] = Operation(
+                    operation_id, method.upper(), path, pattern, parameters,
+                    TypeAdapter(self._type(body["schema"])) if body is not None else None,
+                    {status: TypeAdapter(self._type(response["schema"])) if "schema" in response else None
+                     for status, response in responses.items()},
+                )
+        self.violations = []
+        self.checked = 0  # request bodies and responses
+        self.violation_count = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def load(path: str = DEFAULT_SPEC_PATH) -> "ContractValidator":
+        """
+        Compile the spec file at `path`, once per process.
+        """
+        with open(path) as f:
+            return ContractValidator(json.load(f))
+
+    def _type(self, schema: dict):
+        """
+        Python type validating `schema`, definitions are compiled into models on first use.
+        """
+        if "$ref" in schema:
+            name = schema["$ref"].rsplit("/", 1)[1]
+            if name not in self._models:
+                self._models[name] = None  # recursive definitions are not supported
+                self._models[name] = self._model(name, self.spec["definitions"][name])
+            return self._models[name]
+        if "enum" in schema:
+            return Literal[tuple(schema["enum"])]
+        if schema.get("type") == "array":
+            return list[self._type(schema.get("items", {}))]
+        if schema.get("type") == "object" or "properties" in schema:
+            return self._model("Object", schema)
+        return _PRIMITIVES.get(schema.get("type"), Any)
+
+    def _model(self, name: str, schema: dict):
+        required = set(schema.get("required", ()))
+        fields = {
+            prop: (self._type(prop_schema), ...) if prop in required else (Optional[self._type(prop_schema)], None)
+            for prop, prop_schema in schema.get("properties", {}).items()
+        }
+        return create_model(name, __config__=ConfigDict(extra="allow", strict=True), **fields)
+
+    def example(self, schema: dict, **overrides):
+        """
+        Build a valid instance of `schema` from its examples, enum values and placeholders.
+        """
+        if "$ref" in schema:
+            return self.example(self.spec["definitions"][schema["$ref"].rsplit("/", 1)[1]], **overrides)
+        if "example" in schema:
+            return schema["example"]
+        if "enum" in schema:
+            return schema["enum"][0]
+        if schema.get("type") == "array":
+            return [self.example(schema.get("items", {}))]
+        if schema.get("type") == "object" or "properties" in schema:
+            instance = {prop: self.example(prop_schema) for prop, prop_schema in schema.get("properties", {}).items()}
+            instance.update(overrides)
+            return instance
+        return {"integer": 1, "number": 1.0, "string": "string", "boolean": True}.get(schema.get("type"))
+
+    def operation_for(self, method: str, url: str) -> Operation | None:
+        path = urlsplit(url).path
+        for operation in self.operations.values():
+            if operation.method == method and operation.pattern.match(path):
+                return operation
+        return None
+
+    @staticmethod
+    def _schema_errors(adapter: TypeAdapter, body: bytes) -> str | None:
+        try:
+            adapter.validate_json(body)
+        except ValidationError as e:
+            return f"{e.error_count()} schema errors, first: {e.errors()[0]['msg']} " \
+                   f"at {'.'.join(map(str, e.errors()[0]['loc']))}"
+        return None
+
+    def check(self, operation_id: str, status: int, body: bytes) -> str | None:
+        """
+        Validate a response of the operation.
+
+        :return: None if the response honours the contract, otherwise a description of the violation.
+        """
+        responses = self.operations[operation_id].responses
+        if status not in responses and "default" not in responses:
+            return f"{operation_id}: undeclared status {status}"
+        adapter = responses.get(status, responses.get("default"))
+        errors = self._schema_errors(adapter, body) if adapter is not None else None
+        return f"{operation_id} {status}: {errors}" if errors else None
+
+    def check_request(self, operation_id: str, body: bytes | None) -> str | None:
+        """
+        Validate the body of a request to the operation.
+
+        :param body: The encoded body, None if the request has none.
+        :return: None if the request honours the contract, otherwise a description of the violation.
+        """
+        adapter = self.operations[operation_id].request
+        if adapter is None:
+            return None
+        if body is None:
+            return f"{operation_id} request: missing body"
+        errors = self._schema_errors(adapter, body)
+        return f"{operation_id} request: {errors}" if errors else None
+
+    def validate_response(self, operation_id: str, response: requests.Response):
+        """
+        Raise ContractViolation if `response` does not honour the contract of the operation.
+        """
+        violation = self.check(operation_id, response.status_code, response.content)
+        if violation:
+            raise ContractViolation(violation)
+
+    def record(self, method: str, url: str, status: int, body: bytes):
+        """
+        Check a response of any covered call and count it, violations are kept for the report.
+        """
+        operation = self.operation_for(method, url)
+        if operation is not None:
+            self._count(self.check(operation.operation_id, status, body))
+
+    def record_request(self, method: str, url: str, body: bytes | None):
+        """
+        Check the body of a request of any covered call and count it, violations are kept for the report.
+        """
+        operation = self.operation_for(method, url)
+        if operation is not None and operation.request is not None:
+            self._count(self.check_request(operation.operation_id, body))
+
+    def _count(self, violation: str | None):
+        with self._lock:
+            self.checked += 1
+            if violation:
+                self.violation_count += 1
+                if len(self.violations) < MAX_VIOLATIONS:
+                    self.violations.append(violation)
+
+    def install(self, session: requests.Session):
+        """
+        Check every request body sent and every response received through `session` against the contract.
+        """
+        for prefix, adapter in list(session.adapters.items()):
+            if not isinstance(adapter, ContractAdapter):
+                session.mount(prefix, ContractAdapter(self, adapter))
+
+    def generate_cases(self, first_pet_id: int, operations=COVERED_OPERATIONS) -> list[ContractCase]:
+        """
+        Positive and negative cases for every operation in `operations`.
+
+        Positive cases send requests built from the spec and expect a 2xx answer, negative
+        cases send invalid ids or parameter values and expect one of the declared error answers.
+
+        :param first_pet_id: First of the pet ids the cases create or look up.
+        """
+        pet_schema = {"$ref": "#/definitions/Pet"}
+        pet_ids = iter(range(first_pet_id, first_pet_id + 1000))
+        cases = []
+        for operation_id in operations:
+            operation = self.operations[operation_id]
+            success = {status for status in operation.responses if status != "default" and status < 300}
+            errors = {status for status in operation.responses if status != "default" and status >= 400}
+            path = operation.path
+            if operation_id == "addPet":
+                cases.append(ContractCase("addPet-valid", operation_id, "POST", path, success,
+                                          body=self.example(pet_schema, id=next(pet_ids))))
+                cases.append(ContractCase("addPet-id-not-an-integer", operation_id, "POST", path, errors,
+                                          body=self.example(pet_schema, id="not-an-id")))
+            elif operation_id == "updatePet":
+                pet_id = next(pet_ids)
+                cases.append(ContractCase("updatePet-valid", operation_id, "PUT", path, success,
+                                          body=self.example(pet_schema, id=pet_id, status="sold"),
+                                          setup_pets=[self.example(pet_schema, id=pet_id)]))
+                cases.append(ContractCase("updatePet-id-not-an-integer", operation_id, "PUT", path, errors,
+                                          body=self.example(pet_schema, id="not-an-id")))
+            elif operation_id == "findPetsByStatus":
+                [status_parameter] = [p for p in operation.parameters if p["name"] == "status"]
+                for status in status_parameter["items"]["enum"]:
+                    cases.append(ContractCase(f"findPetsByStatus-{status}", operation_id, "GET", path, success,
+                                              params={"status": status}))
+                cases.append(ContractCase("findPetsByStatus-unknown-status", operation_id, "GET", path, errors,
+                                          params={"status": "not-a-status"}))
+            elif operation_id == "deletePet":
+                pet_id = next(pet_ids)
+                cases.append(ContractCase("deletePet-existing", operation_id, "DELETE",
+                                          path.replace("{petId}", str(pet_id)), success,
+                                          setup_pets=[self.example(pet_schema, id=pet_id)]))
+                cases.append(ContractCase("deletePet-missing", operation_id, "DELETE",
+                                          path.replace("{petId}", str(next(pet_ids))), errors))
+        return cases
+
+
+class ContractAdapter(BaseAdapter):
+    """
+    Transport adapter checking the request bodies and the responses of the wrapped adapter against the contract.
+    """
+
+    def __init__(self, validator: ContractValidator, wrapped: BaseAdapter):
+        super().__init__()
+        self.validator = validator
+        self.wrapped = wrapped
+
+    def send(self, request, stream=False, **kwargs):
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        self.validator.record_request(request.method, request.url, body)
+        response = self.wrapped.send(request, stream=stream, **kwargs)
+        if not stream:
+            self.validator.record(request.method, request.url, response.status_code, response.content)
+        elif self.validator.operation_for(request.method, request.url) is not None:
+            self._record_when_consumed(request, response)
+        return response
+
+    def _record_when_consumed(self, request, response):
+        """
+        Check a streamed response once its body has been read to the end.
+
+        The chunks are kept while the caller consumes them (response.content and iter_lines
+        read through iter_content too). A stream closed before its end is not checked.
+        """
+        iter_content = response.iter_content
+        body = []
+
+        def checked_iter_content(chunk_size=1, decode_unicode=False):
+            for chunk in iter_content(chunk_size, decode_unicode):
+                body.append(chunk.encode(response.encoding or "utf-8") if isinstance(chunk, str) else chunk)
+                yield chunk
+            self.validator.record(request.method, request.url, response.status_code, b"".join(body))
+
+        response.iter_content = checked_iter_content
+
+    def close(self):
+        self.wrapped.close()
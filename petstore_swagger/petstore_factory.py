@@ -0,0 +1,47 @@
+from faker import Faker
+
+DEFAULT_SEED = 1234
+DEFAULT_FIRST_PET_ID = 8_000_000  # clear of the ids used by the single-pet tests and the benchmark
+STATUSES = ("available", "pending", "sold")
+CATEGORIES = ("Dogs", "Cats", "Birds", "Fish", "Reptiles", "Rabbits")
+
+
+class PetFactory:
+    def __init__(self, seed=DEFAULT_SEED, first_id=DEFAULT_FIRST_PET_ID):
+        """
+        Deterministic generator of realistic Petstore pets.
+
+        Every pet is derived from `seed` and its own id only, so the same seed always yields
+        the same dataset, whatever the order or batch size the pets are built in.
+
+        :param seed: Seed of the generated names, categories, tags and statuses.
+        :param first_id: Id of the first pet, the following pets get consecutive ids.
+        """
+        self.seed = seed
+        self.next_id = first_id
+        self.faker = Faker()
+
+    def pet(self, pet_id, status=None):
+        """
+        Build the pet with the given id as a Petstore JSON object.
+
+        :param status: Status of the pet, drawn from STATUSES if omitted.
+        """
+        self.faker.seed_instance(f"{self.seed}-{pet_id}")
+        category_id = self.faker.random_int(1, len(CATEGORIES))
+        return {
+            "id": pet_id,
+            "name": self.faker.first_name(),
+            "category": {"id": category_id, "name": CATEGORIES[category_id - 1]},
+            "photoUrls": [self.faker.image_url()],
+            "tags": [{"id": index + 1, "name": word} for index, word in enumerate(self.faker.words(2))],
+            "status": status or self.faker.random_element(STATUSES),
+        }
+
+    def build(self, count, status=None):
+        """
+        Build `count` new pets with unique ids, continuing after the pets built so far.
+        """
+        pets = [self.pet(pet_id, status) for pet_id in range(self.next_id, self.next_id + count)]
+        self.next_id += count
+        return pets
@@ -0,0 +1,78 @@
+from collections.abc import Sequence
+
+import pydantic_core
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+
+class Category(BaseModel):
+    id: int | None = None
+    name: str | None = None
+
+
+class Tag(BaseModel):
+    id: int | None = None
+    name: str | None = None
+
+
+class Pet(BaseModel):
+    """
+    Pet as returned by the Petstore API.
+
+    Only the id is required: the public demo store holds pets created by anyone,
+    many of them without a name, category or status.
+    """
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: int
+    name: str | None = None
+    category: Category | None = None
+    photo_urls: list[str] = Field(default_factory=list, alias="photoUrls")
+    tags: list[Tag] = Field(default_factory=list)
+    status: str | None = None
+
+
+# Validates a whole findByStatus body straight from the response bytes
+PET_LIST = TypeAdapter(list[Pet])
+
+
+class LazyModelList(Sequence):
+    """
+    Read-only list validating its items into `model` only when they are accessed.
+
+    The JSON body is parsed once by pydantic's native parser, but building and checking
+    the model of a pet is deferred to the first access, so looking at a few pets of a
+    response with thousands skips the validation cost of all the others.
+    """
+
+    def __init__(self, model: type[BaseModel], items: list):
+        self._model = model
+        self._items = items
+        self._validated = {}
+
+    @classmethod
+    def from_json(cls, model: type[BaseModel], data: bytes | str) -> "LazyModelList":
+        items = pydantic_core.from_json(data)
+        if not isinstance(items, list):
+            raise ValueError(f"Expected a JSON array, got {type(items).__name__}")
+        return cls(model, items)
+
+    @property
+    def items(self) -> list:
+        """
+        The parsed but not validated JSON items.
+        """
+        return self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self))[index]  # normalizes negative indexes and raises IndexError
+        if index not in self._validated:
+            self._validated[index] = self._model.model_validate(self._items[index])
+        return self._validated[index]
+
+    def __repr__(self):
+        return f"LazyModelList({self._model.__name__}, {len(self)} items, {len(self._validated)} validated)"
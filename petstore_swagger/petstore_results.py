@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+from petstore_models import Pet
+
+DEFAULT_RESULTS_PATH = os.path.join(".cache", "petstore-results.sqlite3")
+
+
+@dataclass
+class PetDiff:
+    """
+    Differences between the pets seen in two runs.
+
+    added / removed: pet id -> status of pets seen in only one of the runs.
+    status_changed: pet id -> (old status, new status).
+    """
+    added: dict = field(default_factory=dict)
+    removed: dict = field(default_factory=dict)
+    status_changed: dict = field(default_factory=dict)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.status_changed)
+
+
+class ResultStore:
+    """
+    SQLite store of findByStatus results, one snapshot per queried status and run.
+
+    Every pet is kept with its position in the response, so positional checks
+    ("the fourth available pet") and membership checks are indexed lookups instead
+    of new findByStatus calls, and runs can be diffed without refetching.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH, label: str | None = None, read_only: bool = False):
+        """
+        :param path: SQLite file, ':memory:' keeps the results for this process only.
+        :param label: Name of the run started by this store, its start time if omitted.
+        :param read_only: Open existing results for inspection without starting a run.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if read_only:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            self.run_id = None
+            return
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " run_id INTEGER PRIMARY KEY AUTOINCREMENT, label TEXT NOT NULL, started_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS pets ("
+            " run_id INTEGER NOT NULL, query TEXT NOT NULL, position INTEGER NOT NULL,"
+            " id INTEGER NOT NULL, name TEXT, status TEXT, body TEXT NOT NULL,"
+            " PRIMARY KEY (run_id, query, position));"
+            "CREATE INDEX IF NOT EXISTS pets_id ON pets (run_id, query, id);"
+            "CREATE INDEX IF NOT EXISTS pets_name ON pets (run_id, query, name);"
+            "CREATE INDEX IF NOT EXISTS pets_status ON pets (run_id, query, status);"
+        )
+        started_at = time.time()
+        label = label or time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started_at))
+        self.run_id = self._conn.execute("INSERT INTO runs (label, started_at) VALUES (?, ?)",
+                                         (label, started_at)).lastrowid
+
+    def close(self):
+        self._conn.close()
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def save(self, query: str, pets) -> int:
+        """
+        Replace the snapshot of `query` in the current run with `pets`.
+
+        :param query: The status passed to findByStatus.
+        :param pets: Pets in response order, as Pet models or Petstore JSON objects. JSON objects
+                     (the items of a lazy result) are stored as received and only validated when read.
+        :return: Number of pets stored.
+        :raises ValueError: A JSON object has no integer id, nothing is stored.
+        """
+        rows = []
+        for position, pet in enumerate(pets):
+            if isinstance(pet, Pet):
+                pet = pet.model_dump(mode="json", by_alias=True, exclude_none=True)
+            elif not isinstance(pet, dict) or type(pet.get("id")) is not int:
+                raise ValueError(f"Pet at position {position} of {query!r} has no integer id: {pet!r}")
+            rows.append((self.run_id, query, position, pet["id"], pet.get("name"), pet.get("status"),
+                         json.dumps(pet)))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM pets WHERE run_id = ? AND query = ?", (self.run_id, query))
+                self._conn.executemany("INSERT INTO pets VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def has(self, query: str, run_id: int | None = None) -> bool:
+        """
+        Whether a snapshot of `query` was saved in the run (the current one by default).
+        """
+        return bool(self._execute("SELECT 1 FROM pets WHERE run_id = ? AND query = ? LIMIT 1",
+                                  (run_id or self.run_id, query)))
+
+    def count(self, query: str, run_id: int | None = None) -> int:
+        return self._execute("SELECT COUNT(*) FROM pets WHERE run_id = ? AND query = ?",
+                             (run_id or self.run_id, query))[0][0]
+
+    def pet_at(self, query: str, position: int, run_id: int | None = None) -> Pet | None:
+        """
+        :return: The pet at the zero-based `position` of the `query` result, None if there are fewer pets.
+        """
+        rows = self._execute("SELECT body FROM pets WHERE run_id = ? AND query = ? AND position = ?",
+                             (run_id or self.run_id, query, position))
+        return Pet.model_validate_json(rows[0][0]) if rows else None
+
+    def contains(self, query: str, pet_id: int, run_id: int | None = None) -> bool:
+        return bool(self._execute("SELECT 1 FROM pets WHERE run_id = ? AND query = ? AND id = ? LIMIT 1",
+                                  (run_id or self.run_id, query, pet_id)))
+
+    def find_by_name(self, query: str, name: str, run_id: int | None = None) -> list[Pet]:
+        rows = self._execute("SELECT body FROM pets WHERE run_id = ? AND query = ? AND name = ? ORDER BY position",
+                             (run_id or self.run_id, query, name))
+        return [Pet.model_validate_json(body) for body, in rows]
+
+    def mismatched_ids(self, query: str, limit: int, run_id: int | None = None) -> tuple[int, list[int]]:
+        """
+        Pets of the `query` result whose own status differs from the queried one.
+
+        :return: (number of such pets, up to `limit` of their ids).
+        """
+        run_id = run_id or self.run_id
+        condition = "run_id = ? AND query = ? AND status IS NOT ?"
+        count = self._execute(f"SELECT COUNT(*) FROM pets WHERE {condition}", (run_id, query, query))[0][0]
+        ids = self._execute(f"SELECT id FROM pets WHERE {condition} ORDER BY position LIMIT ?",
+                            (run_id, query, query, limit))
+        return count, [pet_id for pet_id, in ids]
+
+    def runs(self) -> list[tuple[int, str, float, int]]:
+        """
+        :return: (run id, label, start time, number of stored pets) of every run, oldest first.
+        """
+        return self._execute(
+            "SELECT runs.run_id, label, started_at, COUNT(pets.id) FROM runs"
+            " LEFT JOIN pets ON pets.run_id = runs.run_id GROUP BY runs.run_id ORDER BY runs.run_id"
+        )
+
+    def latest_run_id(self) -> int | None:
+        """
+        :return: The latest run that stored pets.
+        """
+        return self._execute("SELECT MAX(run_id) FROM pets")[0][0]
+
+    def previous_run_id(self, run_id: int | None = None) -> int | None:
+        """
+        :return: The latest run before `run_id` (the current run by default) that stored pets.
+        """
+        rows = self._execute("SELECT MAX(run_id) FROM pets WHERE run_id < ?", (run_id or self.run_id,))
+        return rows[0][0]
+
+    def diff(self, old_run_id: int, new_run_id: int, query: str | None = None) -> PetDiff:
+        """
+        Compare the pets stored by two runs, across all queries or for one status query only.
+        """
+        def statuses(run_id):
+            sql = "SELECT id, status FROM pets WHERE run_id = ?"
+            params = (run_id,)
+            if query is not None:
+                sql += " AND query = ?"
+                params += (query,)
+            return dict(self._execute(sql, params))
+
+        old, new = statuses(old_run_id), statuses(new_run_id)
+        result = PetDiff()
+        for pet_id, status in new.items():
+            if pet_id not in old:
+                result.added[pet_id] = status
+            elif old[pet_id] != status:
+                result.status_changed[pet_id] = (old[pet_id], status)
+        result.removed = {pet_id: status for pet_id, status in old.items() if pet_id not in new}
+        return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect stored findByStatus results")
+    parser.add_argument("--path", default=DEFAULT_RESULTS_PATH, help="results database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("runs", help="list the stored runs")
+    diff_parser = commands.add_parser("diff", help="report added, removed and status-changed pets between runs")
+    diff_parser.add_argument("--old", type=int, help="run id, the run before --new by default")
+    diff_parser.add_argument("--new", type=int, help="run id, the latest run with results by default")
+    diff_parser.add_argument("--status", help="only compare the results of this findByStatus query")
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.path, read_only=True)
+    if args.command == "runs":
+        for run_id, label, started_at, pets in store.runs():
+            print(f"{run_id}\t{label}\t{pets} pets")
+        return None
+
+    new_run_id = args.new or store.latest_run_id()
+    old_run_id = args.old or (store.previous_run_id(new_run_id) if new_run_id else None)
+    if old_run_id is None or new_run_id is None:
+        parser.error("at least two runs with stored results are needed for a diff")
+    result = store.diff(old_run_id, new_run_id, args.status)
+    print(f"Run {old_run_id} -> {new_run_id}: {len(result.added)} added, {len(result.removed)} removed, "
+          f"{len(result.status_changed)} status changed")
+    for pet_id, status in sorted(result.added.items()):
+        print(f"+ {pet_id} ({status})")
+    for pet_id, status in sorted(result.removed.items()):
+        print(f"- {pet_id} ({status})")
+    for pet_id, (old_status, new_status) in sorted(result.status_changed.items()):
+        print(f"~ {pet_id} {old_status} -> {new_status}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
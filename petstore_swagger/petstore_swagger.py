@@ -1,20 +1,277 @@
+import codecs
+import itertools
+import json
 import requests
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from petstore_models import PET_LIST, LazyModelList, Pet
 
 BASE_URL = "https://petstore.swagger.io/v2"
 
+# Connection pool and retry defaults for the shared session
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.3
+DEFAULT_TIMEOUT = (3.05, 30)  # (connect, read) in seconds
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Bulk provisioning: pets per chunk, requests in flight and retries of 409 Conflict answers
+BULK_CHUNK_SIZE = 100
+BULK_WORKERS = 8
+CONFLICT_RETRIES = 3
+
+# Streaming and logging limits for large findByStatus responses
+STREAM_CHUNK_SIZE = 64 * 1024
+LOG_BODY_LIMIT = 500  # bytes of a response body written to the log
+LOG_PET_IDS = 5  # pet ids written to the log when summarizing a findByStatus result
+MAX_OFFENDING_IDS = 100  # ids kept when streaming validation finds pets with the wrong status
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def truncate(text, limit=LOG_BODY_LIMIT):
+    """
+    Shorten a response body for logging.
+    """
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text)} characters)"
+
+
+def body_preview(response, limit=LOG_BODY_LIMIT):
+    """
+    Start of a response body for logging, only the logged bytes are decoded.
+    """
+    content = response.content
+    preview = content[:limit].decode("utf-8", errors="replace")
+    if len(content) <= limit:
+        return preview
+    return f"{preview}... ({len(content)} bytes)"
+
+
+def iter_json_array(chunks):
+    """
+    Incrementally parse a JSON array from an iterable of byte chunks and yield its elements.
+
+    Only the element being parsed and the unparsed tail of the current chunk are held
+    in memory, so arbitrarily large arrays are processed in constant space.
+
+    :raises ValueError: When the body is not a JSON array, e.g. on a missing or extra ','.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    started = False
+    expect_value = True  # after '[' or ',', otherwise after an element
+    first = True  # nothing but '[' read so far, ']' may close the array
+    chunks = iter(chunks)
+    exhausted = False
+
+    def more():
+        nonlocal buffer, pos, exhausted
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer = buffer[pos:] + utf8.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + utf8.decode(chunk)
+        pos = 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer):
+            if exhausted:
+                raise ValueError("Unexpected end of JSON array")
+            more()
+            continue
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError(f"Expected a JSON array, got {truncate(buffer[pos:], 50)!r}")
+            started = True
+            pos += 1
+            continue
+        if not expect_value:
+            if buffer[pos] == "]":
+                return
+            if buffer[pos] != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {truncate(buffer[pos:], 50)!r}")
+            expect_value = True
+            pos += 1
+            continue
+        if buffer[pos] == "]" and first:
+            return
+        if buffer[pos] in ",]":
+            raise ValueError(f"Expected a value in JSON array, got {truncate(buffer[pos:], 50)!r}")
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            more()
+            continue
+        if end == len(buffer) and not exhausted:
+            # A number at the end of the buffer may continue in the next chunk
+            more()
+            continue
+        pos = end
+        expect_value = first = False
+        yield element
+
+
 class PetstoreAPI:
-    def __init__(self, base_url=BASE_URL):
+    def __init__(self, base_url=BASE_URL, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, timeout=DEFAULT_TIMEOUT, result_store=None,
+                 rate_limiter=None):
+        """
+        Create a client that reuses one keep-alive connection pool for all calls.
+
+        :param base_url: Root URL of the Petstore API.
+        :param pool_connections: Number of host pools to cache.
+        :param pool_maxsize: Maximum number of connections kept alive per host,
+                             should be at least the number of threads sharing the client.
+        :param max_retries: Retries for connection errors and 429/5xx responses.
+        :param backoff_factor: Exponential backoff factor between retries.
+        :param timeout: Default (connect, read) timeout applied to every call.
+        :param result_store: ResultStore keeping every find_pet_by_status result, None to keep nothing.
+        :param rate_limiter: RateLimiter (rate_limit.py) throttling the calls, possibly shared with other clients.
+        """
         self.base_url = base_url
+        self.timeout = timeout
+        self.backoff_factor = backoff_factor
+        self.result_store = result_store
+        self.session = self._build_session(pool_connections, pool_maxsize, max_retries, backoff_factor)
+        if rate_limiter is not None:
+            rate_limiter.install(self.session)
+
+    @staticmethod
+    def _build_session(pool_connections, pool_maxsize, max_retries, backoff_factor):
+        """
+        Build a requests.Session with a pooled adapter and a retry/backoff policy.
+        """
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            # POST/PUT on /pet are upserts keyed by pet id, so they are safe to retry
+            allowed_methods=frozenset({"GET", "POST", "PUT", "DELETE"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({'Connection': 'keep-alive'})
+        return session
+
+    def _request(self, method, url, timeout=None, **kwargs):
+        """
+        Send a request through the shared session using the default timeout unless overridden.
+        """
+        return self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+
+    def _request_retrying_conflicts(self, method, url, conflict_retries=CONFLICT_RETRIES, **kwargs):
+        """
+        Send a request, retrying with exponential backoff while it is answered with 409 Conflict.
+        """
+        for attempt in range(conflict_retries + 1):
+            response = self._request(method, url, **kwargs)
+            if response.status_code != 409 or attempt == conflict_retries:
+                return response
+            logger.info(f"{method} {url} conflicted, retry {attempt + 1} of {conflict_retries}")
+            time.sleep(self.backoff_factor * 2 ** attempt)
+
+    def _bulk(self, call, items, chunk_size, workers):
+        """
+        Apply `call` to every item, one chunk at a time with `workers` requests in flight.
+
+        Only one chunk of items and futures is held at once, so datasets of any size can be
+        fed in as generators. `workers` should not exceed the pool_maxsize of the client.
+
+        :return: The results in the order of `items`.
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="petstore-bulk") as executor:
+            items = iter(items)
+            while chunk := list(itertools.islice(items, chunk_size)):
+                results.extend(executor.map(call, chunk))
+        return results
+
+    def upsert_pets(self, pets, chunk_size=BULK_CHUNK_SIZE, workers=BULK_WORKERS,
+                    conflict_retries=CONFLICT_RETRIES, timeout=None):
+        """
+        Create or replace many pets concurrently.
+
+        Pets are stored with POST /pet, which overwrites the pet with the same id, so
+        running the same upsert again leaves the store unchanged.
+
+        :param pets: Iterable of complete pets, as Pet models or Petstore JSON objects.
+        :return: The stored pets as Pet models in the order of `pets`.
+        """
+        url = f"{self.base_url}/pet"
+        headers = {'Content-Type': 'application/json'}
+
+        def upsert(pet):
+            if isinstance(pet, Pet):
+                pet = pet.model_dump(mode="json", by_alias=True, exclude_none=True)
+            response = self._request_retrying_conflicts("POST", url, conflict_retries, json=pet,
+                                                        headers=headers, timeout=timeout)
+            response.raise_for_status()
+            return Pet.model_validate_json(response.content)
+
+        started = time.perf_counter()
+        stored = self._bulk(upsert, pets, chunk_size, workers)
+        logger.info(f"Upserted {len(stored)} pets in {time.perf_counter() - started:.2f}s")
+        return stored
+
+    def delete_pets(self, pet_ids, chunk_size=BULK_CHUNK_SIZE, workers=BULK_WORKERS,
+                    conflict_retries=CONFLICT_RETRIES, timeout=None):
+        """
+        Delete many pets concurrently, pets that do not exist (anymore) are skipped.
+
+        :param pet_ids: Iterable of pet ids.
+        :return: Number of pets actually deleted.
+        """
+        def delete(pet_id):
+            response = self._request_retrying_conflicts("DELETE", f"{self.base_url}/pet/{pet_id}",
+                                                        conflict_retries, timeout=timeout)
+            if response.status_code == 404:
+                return False
+            response.raise_for_status()
+            return True
 
-    def create_new_pet(self, pet_id, name, category, tags):
+        started = time.perf_counter()
+        deleted = sum(self._bulk(delete, pet_ids, chunk_size, workers))
+        logger.info(f"Deleted {deleted} pets in {time.perf_counter() - started:.2f}s")
+        return deleted
+
+    def close(self):
+        """
+        Close the session and release all pooled connections.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def create_new_pet(self, pet_id, name, category, tags, timeout=None):
         """
         Create a new pet with the status 'available'.
+
+        :return: The stored Pet.
         """
         url = f"{self.base_url}/pet"
         headers = {'Content-Type': 'application/json'}
@@ -27,13 +284,16 @@ class PetstoreAPI:
             "status": "available"
         }
 
-        response = requests.post(url, json=data, headers=headers)
-        logger.info(f"Create Pet Response: {response.status_code} - {response.text}")
-        return response.json()
+        response = self._request("POST", url, json=data, headers=headers, timeout=timeout)
+        logger.info(f"Create Pet Response: {response.status_code} - {body_preview(response)}")
+        response.raise_for_status()
+        return Pet.model_validate_json(response.content)
 
-    def update_pet_status(self, pet_id, status):
+    def update_pet_status(self, pet_id, status, timeout=None):
         """
         Update the status of an existing pet.
+
+        :return: The updated Pet.
         """
         url = f"{self.base_url}/pet"
         headers = {'Content-Type': 'application/json'}
@@ -42,27 +302,80 @@ class PetstoreAPI:
             "status": status
         }
 
-        response = requests.put(url, json=data, headers=headers)
-        logger.info(f"Update Pet Status Response: {response.status_code} - {response.text}")
-        return response.json()
+        response = self._request("PUT", url, json=data, headers=headers, timeout=timeout)
+        logger.info(f"Update Pet Status Response: {response.status_code} - {body_preview(response)}")
+        response.raise_for_status()
+        return Pet.model_validate_json(response.content)
 
-    def find_pet_by_status(self, status):
+    def find_pet_by_status(self, status, lazy=False, timeout=None):
         """
         Find pets by status.
+
+        :param lazy: Validate each pet only when it is accessed, cheaper when only a few
+                     pets of a large response are looked at.
+        :return: A list of Pets, or a LazyModelList of Pets in lazy mode.
         """
         url = f"{self.base_url}/pet/findByStatus?status={status}"
-        response = requests.get(url)
-        logger.info(f"Find Pet by Status Response: {response.status_code} - {response.text}")
-        return response.json()
+        response = self._request("GET", url, timeout=timeout)
+        logger.info(f"Find Pet by Status Response: {response.status_code} - {body_preview(response)}")
+        response.raise_for_status()
+        if lazy:
+            pets = LazyModelList.from_json(Pet, response.content)
+            if self.result_store is not None:
+                # The raw items are stored, the pets stay unvalidated until they are accessed
+                self.result_store.save(status, pets.items)
+            return pets
+        pets = PET_LIST.validate_json(response.content)
+        if self.result_store is not None:
+            self.result_store.save(status, pets)
+        return pets
 
-    def verify_fourth_pet_name(self, status, expected_name):
+    def _snapshot(self, status):
+        """
+        Result store holding the findByStatus result of `status` for this run, queried once if missing.
+        """
+        if self.result_store is None:
+            raise ValueError("Snapshot checks need a PetstoreAPI created with a result_store")
+        if not self.result_store.has(status):
+            self.find_pet_by_status(status, lazy=True)
+        return self.result_store
+
+    def iter_pets_by_status(self, status, timeout=None):
+        """
+        Find pets by status, parsing the response incrementally and yielding Pets one by one.
+
+        The body is never held in memory as a whole, which keeps memory flat for
+        findByStatus responses with tens of thousands of records.
+        """
+        url = f"{self.base_url}/pet/findByStatus?status={status}"
+        with self._request("GET", url, timeout=timeout, stream=True) as response:
+            logger.info(f"Find Pet by Status Response (streamed): {response.status_code}")
+            response.raise_for_status()
+            count = 0
+            chunks = response.iter_content(STREAM_CHUNK_SIZE)
+            for pet in iter_json_array(chunks):
+                count += 1
+                yield Pet.model_validate(pet)
+            for _ in chunks:  # reading to the end puts the connection back into the pool
+                pass
+            logger.info(f"Streamed {count} pets with the status {status}")
+
+    def verify_fourth_pet_name(self, status, expected_name, snapshot=False):
         """
         Verify that the name of the fourth pet with the given status is as expected.
+
+        :param snapshot: Look the pet up in the result store snapshot of this run
+                         instead of querying findByStatus again.
         """
-        pets = self.find_pet_by_status(status)
-        if len(pets) >= 4:
-            fourth_pet = pets[3]  # List is zero-indexed
-            actual_name = fourth_pet.get('name')  # Get the pet's name from the response
+        if snapshot:
+            fourth_pet = self._snapshot(status).pet_at(status, 3)  # Positions are zero-indexed
+        else:
+            # Stream the response and stop reading after the fourth pet
+            pets = self.iter_pets_by_status(status)
+            fourth_pet = next(itertools.islice(pets, 3, None), None)  # List is zero-indexed
+            pets.close()
+        if fourth_pet is not None:
+            actual_name = fourth_pet.name  # Get the pet's name from the response
             logger.info(f"Actual name of the fourth pet: {actual_name}")
             assert actual_name == expected_name, f"Expected name: {expected_name}, but got: {actual_name}"
             logger.info(f"Fourth pet name is correctly {expected_name}")
@@ -73,14 +386,51 @@ class PetstoreAPI:
     def validate_pets_status(self, status):
         """
         Validate that all pets returned by the status query have the expected status.
+
+        :return: Number of pets checked.
         """
-        pets_with_status = []
         pets = self.find_pet_by_status(status)
         for pet in pets:
-            assert pet['status'] == status, f"Pet ID {pet['id']} does not have the status {status}"
-            pets_with_status.append(pet)
-        logger.info(f"All pets with the status {status}: {pets_with_status}")
-        return pets_with_status
+            assert pet.status == status, f"Pet ID {pet.id} does not have the status {status}"
+        logger.info(f"All {len(pets)} pets have the status {status}, e.g. pet IDs "
+                    f"{[pet.id for pet in itertools.islice(pets, LOG_PET_IDS)]}")
+        return len(pets)
+
+    def validate_stored_pets_status(self, status):
+        """
+        Validate that all pets of this run's stored findByStatus result have the expected status,
+        using an indexed lookup in the result store instead of a new query.
+
+        :return: Number of pets checked.
+        """
+        store = self._snapshot(status)
+        count = store.count(status)
+        offending_count, offending_ids = store.mismatched_ids(status, MAX_OFFENDING_IDS)
+        logger.info(f"Checked {count} stored pets with the status {status}, {offending_count} with another status")
+        assert not offending_count, \
+            f"{offending_count} pets do not have the status {status}, e.g. pet IDs {offending_ids}"
+        return count
+
+    def validate_pets_status_streaming(self, status):
+        """
+        Validate that all pets returned by the status query have the expected status,
+        checking each pet as it is parsed and keeping only counters and offending IDs.
+
+        :return: Number of pets checked.
+        """
+        count = 0
+        offending_count = 0
+        offending_ids = []
+        for pet in self.iter_pets_by_status(status):
+            count += 1
+            if pet.status != status:
+                offending_count += 1
+                if len(offending_ids) < MAX_OFFENDING_IDS:
+                    offending_ids.append(pet.id)
+        logger.info(f"Checked {count} pets with the status {status}, {offending_count} with another status")
+        assert not offending_count, \
+            f"{offending_count} pets do not have the status {status}, e.g. pet IDs {offending_ids}"
+        return count
 
 
 # Example usage
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from petstore_async import AsyncPetstoreAPI
+
+
+BASE_URL = "https://petstore.swagger.io/v2"
+
+
+async def collect(agen):
+    return [item async for item in agen]
+
+
+@pytest.fixture
+def base_url(stub_server):
+    return stub_server.petstore_url if stub_server else BASE_URL
+
+
+def test_create_pets_batch(request, base_url, configure_http_session, petstore_api, pet_factory):
+    pets = pet_factory.build(10)
+    request.addfinalizer(lambda: petstore_api.delete_pets(pet['id'] for pet in pets))
+
+    async def run():
+        async with AsyncPetstoreAPI(base_url, concurrency=5) as api:
+            configure_http_session(api.client.session)
+            return await collect(api.create_pets(
+                {"pet_id": pet['id'], "name": pet['name'], "category": pet['category']['name'],
+                 "tags": [tag['name'] for tag in pet['tags']]} for pet in pets))
+
+    created = asyncio.run(run())
+    assert sorted(pet.id for pet in created) == [pet['id'] for pet in pets]
+    assert all(pet.status == "available" for pet in created)
+
+
+def test_find_pets_by_statuses(base_url, configure_http_session):
+    async def run():
+        async with AsyncPetstoreAPI(base_url) as api:
+            configure_http_session(api.client.session)
+            return dict(await collect(api.find_pets_by_statuses(["available", "pending", "sold"])))
+
+    results = asyncio.run(run())
+    assert set(results) == {"available", "pending", "sold"}
+    for status, pets in results.items():
+        assert all(pet.status == status for pet in pets)
+
+
+def test_fan_out_respects_concurrency(mocker):
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_find(status, timeout=None):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return []
+
+    async def run():
+        async with AsyncPetstoreAPI(BASE_URL, concurrency=4) as api:
+            mocker.patch.object(api.client, "find_pet_by_status", side_effect=slow_find)
+            return await collect(api.find_pets_by_statuses(str(i) for i in range(40)))
+
+    results = asyncio.run(run())
+    assert len(results) == 40
+    assert peak <= 4
+
+
+if __name__ == "__main__":
+    pytest.main()
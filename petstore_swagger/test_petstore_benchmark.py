@@ -0,0 +1,45 @@
+import random
+
+import pytest
+from petstore_swagger import PetstoreAPI
+from petstore_benchmark import LatencyHistogram, PetstoreBenchmark, compare_reports
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    rng = random.Random(1234)
+    values = [rng.uniform(0.0001, 2.0) for _ in range(10000)]
+    for value in values:
+        histogram.record(value)
+    values.sort()
+    for percent in (50, 95, 99):
+        exact = values[round(len(values) * percent / 100) - 1] * 1_000_000
+        assert abs(histogram.percentile(percent) - exact) / exact < 0.01
+    assert histogram.count == 10000
+
+
+def test_histogram_merge():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(0.001)
+    second.record(0.003)
+    first.merge(second)
+    assert first.count == 2
+    assert first.max == 3000
+    assert abs(first.percentile(100) - 3000) / 3000 < 0.01
+    assert first.min == 1000
+
+
+def test_benchmark_short_run(stub_server):
+    if not stub_server:
+        pytest.skip("Load tests only run against the stand-in server (--stub-server), not the public store")
+    with PetstoreAPI(stub_server.petstore_url, pool_maxsize=4) as api:
+        report = PetstoreBenchmark(api, concurrency=4, rps=20, duration=1).run()
+    assert report["requests"] > 0
+    assert report["latency"]["workflow"]["count"] == report["workflows"]
+    assert set(compare_reports(report, report).values()) == {0.0}
+    assert report["pets_deleted"] == report["latency"]["create"]["count"]
+    assert stub_server.app.state.store.get(9_000_000) is None
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+import requests
+from petstore_contract import DEFAULT_SPEC_PATH, UNDECLARED_RESPONSES, ContractValidator, ContractViolation
+from petstore_swagger import PetstoreAPI
+from stub_server import StubServer, create_app
+
+
+CONTRACT_FIRST_PET_ID = 7_500_000  # clear of the ids used by the other Petstore tests
+
+# Compiled once at collection, the cases need neither the network nor a running server
+CONTRACT = ContractValidator.load()
+CASES = CONTRACT.generate_cases(CONTRACT_FIRST_PET_ID)
+# Cases the public demo store is known to answer differently from its own spec
+LIVE_DEVIATIONS = {
+    "addPet-id-not-an-integer": "the public store answers 500 instead of 405",
+    "updatePet-id-not-an-integer": "the public store answers 500 instead of 400",
+    "findPetsByStatus-unknown-status": "the public store answers 200 [] instead of 400",
+    **{case.name: "the public store holds pets without the required name and photoUrls"
+       for case in CASES if case.name.startswith("findPetsByStatus-") and case.expected_statuses == {200}},
+}
+# Answers of every Petstore service, the public store and the stand-in server alike, that
+# petstore_spec.json (kept as published) does not declare. They are compiled from
+# petstore_contract.UNDECLARED_RESPONSES.
+SPEC_DEVIATIONS = {
+    ("addPet", 200): "the spec only declares 405, the store answers 200 with the stored pet",
+    ("updatePet", 200): "the spec only declares 400, 404 and 405, the store answers 200 with the updated pet",
+    ("deletePet", 200): "the spec only declares 400 and 404, the store answers 200 with an ApiResponse",
+}
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_contract(request, stub_server, petstore_api, case):
+    """
+    Sends a generated request and checks its status and body against the Petstore spec.
+
+    The stand-in server honours the spec, the known deviations of the public store are xfailed.
+    """
+    if not stub_server and case.name in LIVE_DEVIATIONS:
+        request.applymarker(pytest.mark.xfail(reason=LIVE_DEVIATIONS[case.name]))
+    created_ids = [pet['id'] for pet in case.setup_pets]
+    if isinstance(case.body, dict) and isinstance(case.body.get('id'), int):
+        created_ids.append(case.body['id'])
+    if case.body is not None:
+        request_violation = CONTRACT.check_request(case.operation_id, json.dumps(case.body).encode())
+        assert (request_violation is None) == all(status < 300 for status in case.expected_statuses), \
+            f"{case.name}: {request_violation or 'the invalid request body passed validation'}"
+    try:
+        if case.setup_pets:
+            petstore_api.upsert_pets(case.setup_pets)
+        response = petstore_api.session.request(case.method, f"{petstore_api.base_url}{case.path}",
+                                                params=case.params, json=case.body, timeout=petstore_api.timeout)
+        assert response.status_code in case.expected_statuses, \
+            f"{case.name}: expected one of {sorted(case.expected_statuses)}, got {response.status_code}"
+        CONTRACT.validate_response(case.operation_id, response)
+    finally:
+        petstore_api.delete_pets(created_ids)
+
+
+def test_cases_cover_every_petstore_api_operation():
+    assert {case.operation_id for case in CASES} == {"addPet", "updatePet", "findPetsByStatus", "deletePet"}
+    assert all(case.expected_statuses for case in CASES)
+
+
+def test_spec_deviations_are_documented():
+    with open(DEFAULT_SPEC_PATH) as f:
+        spec = json.load(f)
+    declared = {(operation["operationId"], int(status)) for methods in spec["paths"].values()
+                for operation in methods.values() for status in operation["responses"]}
+    undeclared = {(operation_id, status) for operation_id, responses in UNDECLARED_RESPONSES.items()
+                  for status in responses}
+    assert undeclared == set(SPEC_DEVIATIONS)
+    assert not undeclared & declared
+
+
+def test_spec_is_compiled_once():
+    assert ContractValidator.load() is CONTRACT
+
+
+def test_response_violations_are_reported():
+    pets = json.dumps([{"id": 1, "name": "doggie", "photoUrls": [], "status": "available"}]).encode()
+    assert CONTRACT.check("findPetsByStatus", 200, pets) is None
+    assert CONTRACT.check("findPetsByStatus", 400, b"") is None
+    assert "undeclared status 500" in CONTRACT.check("findPetsByStatus", 500, b"")
+    assert "schema errors" in CONTRACT.check("findPetsByStatus", 200, b'[{"id": "1", "photoUrls": []}]')
+    assert "schema errors" in CONTRACT.check("addPet", 200, b'{"id": 1, "name": "doggie", "status": "lost"}')
+
+
+def test_request_violations_are_reported():
+    pet = {"id": 1, "name": "doggie", "photoUrls": [], "status": "available"}
+    assert CONTRACT.check_request("addPet", json.dumps(pet).encode()) is None
+    assert CONTRACT.check_request("findPetsByStatus", None) is None
+    assert "missing body" in CONTRACT.check_request("updatePet", None)
+    assert "schema errors" in CONTRACT.check_request("updatePet", b'{"id": 1, "status": "sold"}')
+
+
+def test_validate_response_raises_on_violation():
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'[{"id": 1, "name": "doggie", "photoUrls": [], "status": "sold"}]'
+    CONTRACT.validate_response("findPetsByStatus", response)
+    response._content = b"{}"
+    with pytest.raises(ContractViolation):
+        CONTRACT.validate_response("findPetsByStatus", response)
+
+
+def test_contract_adapter_checks_every_call():
+    with open(DEFAULT_SPEC_PATH) as f:
+        validator = ContractValidator(json.load(f))
+    with StubServer(create_app()) as server, PetstoreAPI(server.petstore_url) as api:
+        validator.install(api.session)
+        api.find_pet_by_status("sold")
+        api.delete_pets([CONTRACT_FIRST_PET_ID - 1])
+        assert validator.checked == 2
+        streamed = list(api.iter_pets_by_status("sold"))  # validated once the stream is read to the end
+        assert validator.checked == 3
+        api.create_new_pet(CONTRACT_FIRST_PET_ID - 2, "Contract", "Dogs", [])
+        api.update_pet_status(CONTRACT_FIRST_PET_ID - 2, "sold")  # the spec wants the whole pet
+    assert validator.checked == 7
+    assert streamed and len(validator.violations) == 1
+    assert validator.violations[0].startswith("updatePet request: ")
@@ -1,5 +1,10 @@
 import pytest
-from petstore_swagger import PetstoreAPI  # Ensure this matches the actual filename and class name
+import json
+import sqlite3
+from petstore_swagger import PetstoreAPI, iter_json_array  # Ensure this matches the actual filename and class name
+from petstore_factory import PetFactory
+from petstore_models import LazyModelList, Pet
+from petstore_results import ResultStore, main as results_main
 
 """
      Examples of possible tests scenarios...
@@ -7,28 +12,62 @@ from petstore_swagger import PetstoreAPI  # Ensure this matches the actual filen
 
 
 BASE_URL = "https://petstore.swagger.io/v2"
+STUB_PET_DATASET_SIZE = 500  # pets loaded with --stub-server when --pet-dataset-size is not given
 
 
-@pytest.fixture
-def petstore_api():
-    return PetstoreAPI(BASE_URL)
+@pytest.fixture(scope="session")
+def pet_dataset(request, stub_server, petstore_api, pet_factory):
+    # Large set of 'pending' pets loaded once per session and removed afterwards
+    size = request.config.getoption("--pet-dataset-size") or (STUB_PET_DATASET_SIZE if stub_server else 0)
+    if not size:
+        pytest.skip("Loading pets on the public store needs an explicit --pet-dataset-size")
+    pets = pet_factory.build(size, status="pending")
+    petstore_api.upsert_pets(pets)
+    yield pets
+    petstore_api.delete_pets(pet['id'] for pet in pets)
 
 
-def test_create_new_pet(petstore_api):
-    new_pet = petstore_api.create_new_pet(pet_id=123456, name="Fido", category="Dogs", tags=["friendly", "playful"])
-    assert new_pet['name'] == "Fido"
-    assert new_pet['status'] == "available"
+def test_create_new_pet(petstore_api, pet_factory):
+    pet_id = pet_factory.build(1)[0]['id']
+    new_pet = petstore_api.create_new_pet(pet_id=pet_id, name="Fido", category="Dogs", tags=["friendly", "playful"])
+    assert new_pet.name == "Fido"
+    assert new_pet.status == "available"
+    petstore_api.delete_pets([pet_id])
 
 
-def test_update_pet_status(petstore_api):
-    updated_pet = petstore_api.update_pet_status(pet_id=123456, status="sold")
-    assert updated_pet['status'] == "sold"
+def test_update_pet_status(petstore_api, pet_factory):
+    pet = petstore_api.upsert_pets(pet_factory.build(1, status="available"))[0]
+    updated_pet = petstore_api.update_pet_status(pet_id=pet.id, status="sold")
+    assert updated_pet.status == "sold"
+    petstore_api.delete_pets([pet.id])
+
+
+def test_upsert_and_delete_pets_are_idempotent(petstore_api, pet_factory):
+    pets = [Pet.model_validate(pet) for pet in pet_factory.build(25, status="sold")]
+    assert petstore_api.upsert_pets(pets, chunk_size=10) == pets
+    assert petstore_api.upsert_pets(pets, chunk_size=10) == pets
+    assert petstore_api.delete_pets((pet.id for pet in pets), chunk_size=10) == len(pets)
+    assert petstore_api.delete_pets(pet.id for pet in pets) == 0
+
+
+def test_find_pet_by_status_large_dataset(petstore_api, pet_dataset):
+    expected_ids = {pet['id'] for pet in pet_dataset}
+    found_ids = {pet.id for pet in petstore_api.iter_pets_by_status("pending")}
+    assert expected_ids <= found_ids, f"{len(expected_ids - found_ids)} seeded pets are missing"
+
+
+def test_pet_factory_is_deterministic():
+    first, second = PetFactory(seed=7), PetFactory(seed=7)
+    pets = first.build(3) + first.build(2)
+    assert pets == second.build(5)
+    assert len({pet['id'] for pet in pets}) == 5
+    assert PetFactory(seed=8).build(5) != pets
 
 
 def test_find_pet_by_status_available(petstore_api):
     pets = petstore_api.find_pet_by_status("available")
     if len(pets) >= 4:
-        assert pets[3]['name'] == "Puff"
+        assert pets[3].name == "Puff"
     else:
         pytest.skip("Less than four pets available, skipping the test.")
 
@@ -36,7 +75,120 @@ def test_find_pet_by_status_available(petstore_api):
 def test_find_pet_by_status_sold(petstore_api):
     pets = petstore_api.find_pet_by_status("sold")
     for pet in pets:
-        assert pet['status'] == "sold"
+        assert pet.status == "sold"
+
+
+def test_verify_fourth_pet_name_snapshot(petstore_api, result_store):
+    pets = petstore_api.find_pet_by_status("available")
+    if len(pets) < 4:
+        pytest.skip("Less than four pets available, skipping the test.")
+    petstore_api.verify_fourth_pet_name("available", "Puff", snapshot=True)
+    assert result_store.contains("available", pets[3].id)
+    assert result_store.count("available") == len(pets)
+
+
+def test_find_pet_by_status_lazy_stores_unvalidated_pets(petstore_api, result_store):
+    pets = petstore_api.find_pet_by_status("available", lazy=True)
+    assert repr(pets).endswith(" 0 validated)")
+    assert result_store.count("available") == len(pets)
+
+
+def test_validate_stored_pets_status(petstore_api):
+    assert petstore_api.validate_stored_pets_status("sold") >= 0
+
+
+class FailingInserts:
+    """
+    SQLite connection proxy whose inserts fail, like on a full disk.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, *args):
+        return self.conn.execute(*args)
+
+    def executemany(self, *args):
+        raise sqlite3.OperationalError("database or disk is full")
+
+
+def test_result_store_save_rolls_back_on_error():
+    store = ResultStore(":memory:")
+    store.save("sold", [Pet(id=1, name="a", status="sold")])
+    conn, store._conn = store._conn, FailingInserts(store._conn)
+    with pytest.raises(sqlite3.OperationalError):
+        store.save("sold", [Pet(id=2, name="b", status="sold")])
+    store._conn = conn
+    assert store.pet_at("sold", 0).id == 1, "the failed save must not delete the previous snapshot"
+    assert store.save("pending", [{"id": 3, "status": "pending"}, {"id": 4, "name": "d"}]) == 2
+    assert store.pet_at("pending", 1) == Pet(id=4, name="d")
+    with pytest.raises(ValueError):
+        store.save("pending", [{"name": "no id"}])
+    assert store.count("pending") == 2
+    store.close()
+
+
+def test_result_store_diff_between_runs(tmp_path, capsys):
+    path = str(tmp_path / "results.sqlite3")
+    first = ResultStore(path, label="first")
+    first.save("sold", [Pet(id=1, name="a", status="sold"), Pet(id=2, name="b", status="sold")])
+    first.save("pending", [{"id": 3, "name": "c", "status": "pending"}])
+    first.close()
+    second = ResultStore(path, label="second")
+    second.save("sold", [Pet(id=2, name="b", status="sold"), Pet(id=3, name="c", status="sold")])
+    assert second.pet_at("sold", 1).name == "c"
+    assert second.find_by_name("sold", "b") == [Pet(id=2, name="b", status="sold")]
+    assert second.mismatched_ids("sold", 10) == (0, [])
+    diff = second.diff(second.previous_run_id(), second.run_id)
+    assert (diff.added, diff.removed, diff.status_changed) == ({}, {1: "sold"}, {3: ("pending", "sold")})
+    assert second.diff(second.previous_run_id(), second.run_id, "sold").added == {3: "sold"}
+    second.close()
+
+    assert results_main(["--path", path, "diff"]) == diff
+    assert "1 removed, 1 status changed" in capsys.readouterr().out
+
+
+def test_find_pet_by_status_lazy(petstore_api):
+    pets = petstore_api.find_pet_by_status("available", lazy=True)
+    if len(pets) >= 4:
+        assert pets[3].name == "Puff"
+    assert all(isinstance(pet, Pet) for pet in pets[:4])
+
+
+def test_find_pet_by_status_sold_streaming(petstore_api):
+    assert petstore_api.validate_pets_status_streaming("sold") >= 0
+
+
+def test_verify_fourth_pet_name_streaming(petstore_api):
+    petstore_api.verify_fourth_pet_name("available", "Puff")
+
+
+def test_iter_json_array_across_chunk_boundaries():
+    pets = [{"id": i, "name": f"Pét {i}", "status": "sold", "tags": [1.5, None, True]} for i in range(50)]
+    body = json.dumps(pets, ensure_ascii=False).encode("utf-8")
+    for size in (1, 3, 7, 64, len(body)):
+        chunks = (body[i:i + size] for i in range(0, len(body), size))
+        assert list(iter_json_array(chunks)) == pets
+    assert list(iter_json_array([b"[12", b"34, 5", b"]"])) == [1234, 5]
+    assert list(iter_json_array([b" [ ] "])) == []
+
+
+@pytest.mark.parametrize("body", [b"[,1]", b"[1,,2]", b"[1,]", b"[1 2]", b"[,]", b"[1"])
+def test_iter_json_array_rejects_malformed_arrays(body):
+    for chunks in ([body], [body[i:i + 1] for i in range(len(body))]):
+        with pytest.raises(ValueError):
+            list(iter_json_array(chunks))
+
+
+def test_lazy_model_list_validates_on_access():
+    pets = LazyModelList.from_json(Pet, b'[{"id": 1, "photoUrls": ["a"]}, {"id": "not a number"}]')
+    assert len(pets) == 2
+    assert pets[0] == Pet(id=1, photo_urls=["a"])
+    assert pets[-2] is pets[0]
+    with pytest.raises(ValueError):
+        pets[1]
+    with pytest.raises(IndexError):
+        pets[2]
 
 
 def test_print_elements_text(capsys, petstore_api):
@@ -48,5 +200,13 @@ def test_print_elements_text(capsys, petstore_api):
         assert str(pet) in captured.out
 
 
+def test_session_uses_pooled_adapter():
+    with PetstoreAPI(BASE_URL, pool_maxsize=25, max_retries=5) as api:
+        adapter = api.session.get_adapter(BASE_URL)
+        assert adapter._pool_maxsize == 25
+        assert adapter.max_retries.total == 5
+        assert api.session.get_adapter("http://example.com") is adapter
+
+
 if __name__ == "__main__":
     pytest.main()
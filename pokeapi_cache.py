@@ -0,0 +1,213 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple
+
+import requests
+
+DEFAULT_TTL = 7 * 24 * 60 * 60  # PokeAPI resources are effectively immutable
+DEFAULT_MEMORY_SIZE = 512
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_CACHE_PATH = os.path.join(".cache", "pokeapi.sqlite3")
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class MemoryLRU:
+    """
+    In-memory least-recently-used store for cache entries.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMORY_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, url: str) -> CacheEntry | None:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def set(self, entry: CacheEntry):
+        self._entries[entry.url] = entry
+        self._entries.move_to_end(entry.url)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, url: str):
+        self._entries.pop(url, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class SQLiteStore:
+    """
+    On-disk store keeping zlib-compressed response bodies in a SQLite file.
+
+    The total stored size is bounded by `max_bytes`; the least recently accessed
+    entries are evicted first.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL,"
+            " etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def get(self, url: str) -> CacheEntry | None:
+        row = self._conn.execute(
+            "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        body, etag, last_modified, fetched_at = row
+        return CacheEntry(url, zlib.decompress(body), etag, last_modified, fetched_at)
+
+    def set(self, entry: CacheEntry):
+        body = zlib.compress(entry.content)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (entry.url, body, len(body), entry.etag, entry.last_modified, entry.fetched_at, time.time()),
+        )
+        self._evict()
+
+    def delete(self, url: str):
+        self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def clear(self):
+        self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        self._conn.close()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.delete(url)
+            total -= size
+
+
+class ResponseCache:
+    """
+    Read-through cache for GET requests: an in-memory LRU in front of an optional
+    persistent store.
+
+    Fresh entries (younger than `ttl`) are served without touching the network.
+    Stale entries are revalidated with a conditional GET (If-None-Match / If-Modified-Since)
+    and a 304 reply refreshes them in place. Only 200 responses are cached.
+
+    Responses served from the cache never reach the session's adapters, `on_hit` is
+    called with the URL and the CacheEntry of each of them instead.
+    """
+
+    def __init__(self, store=None, memory_size: int = DEFAULT_MEMORY_SIZE, ttl: float = DEFAULT_TTL):
+        self.store = store
+        self.memory = MemoryLRU(memory_size)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.on_hit = None
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations}
+
+    def _lookup(self, url: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self.memory.get(url)
+            if entry is None and self.store is not None:
+                entry = self.store.get(url)
+                if entry is not None:
+                    self.memory.set(entry)
+            return entry
+
+    def _save(self, entry: CacheEntry):
+        with self._lock:
+            self.memory.set(entry)
+            if self.store is not None:
+                self.store.set(entry)
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            if self.store is not None:
+                self.store.clear()
+
+    def get(self, session: requests.Session, url: str, **kwargs) -> requests.Response:
+        """
+        GET `url` through the cache using `session` for network access.
+
+        :return: A requests.Response; cached replies are rebuilt from the stored body.
+        """
+        entry = self._lookup(url)
+        if entry is not None and time.time() - entry.fetched_at < self.ttl:
+            with self._lock:
+                self.hits += 1
+            if self.on_hit is not None:
+                self.on_hit(url, entry)
+            return self._build_response(url, entry)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = session.get(url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            entry = entry._replace(fetched_at=time.time())
+            self._save(entry)
+            with self._lock:
+                self.revalidations += 1
+            return self._build_response(url, entry)
+
+        with self._lock:
+            self.misses += 1
+        if response.status_code == 200:
+            self._save(CacheEntry(
+                url, response.content, response.headers.get("ETag"),
+                response.headers.get("Last-Modified"), time.time(),
+            ))
+        return response
+
+    @staticmethod
+    def _build_response(url: str, entry: CacheEntry) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = url
+        response._content = entry.content
+        response._content_consumed = True
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        if entry.etag:
+            response.headers["ETag"] = entry.etag
+        if entry.last_modified:
+            response.headers["Last-Modified"] = entry.last_modified
+        return response
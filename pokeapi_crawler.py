@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pokeapi_cache import DEFAULT_CACHE_PATH, ResponseCache, SQLiteStore
+from pokeapi_models import MODELS
+from rate_limit import RateLimiter
+
+POKEAPI_URL = "https://pokeapi.co/api/v2"
+ENDPOINTS = ("pokemon", "pokemon-species")
+DEFAULT_CHECKPOINT_PATH = os.path.join(".cache", "pokeapi-crawl.json")
+DEFAULT_PAGE_SIZE = 200
+DEFAULT_MAX_WORKERS = 8
+# PokeAPI's fair use policy asks clients to cache and limit the request rate, so the
+# crawler stays well below what the API tolerates. Cached resources are not throttled.
+DEFAULT_RATE = 10.0
+CHECKPOINT_EVERY = 50  # fetched resources between two checkpoint writes
+
+
+def resource_id(url: str) -> int:
+    """
+    Id at the end of a PokeAPI resource URL such as https://pokeapi.co/api/v2/pokemon/25/.
+    """
+    return int(url.rstrip("/").rsplit("/", 1)[1])
+
+
+def sample_ids(population, k: int, seed: int) -> list[int]:
+    """
+    Deterministic sample of `k` ids: the same population and seed always give the same ids.
+    """
+    population = sorted(population)
+    return sorted(random.Random(seed).sample(population, min(k, len(population))))
+
+
+def crawled_ids(checkpoint_path: str, base_url: str = POKEAPI_URL) -> list[int] | None:
+    """
+    Ids listed by every endpoint in the checkpoint of a crawl of `base_url`.
+
+    :return: The sorted ids, None if there is no complete listing of that API in the checkpoint.
+    """
+    try:
+        with open(checkpoint_path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    lists = state.get("lists", {})
+    if state.get("base_url") != base_url or any(lists.get(endpoint, {}).get("next", "") is not None
+                                                  for endpoint in ENDPOINTS):
+        return None
+    return sorted(set.intersection(*(set(map(int, lists[endpoint]["resources"])) for endpoint in ENDPOINTS)))
+
+
+class PokeAPICrawler:
+    """
+    Crawls every Pokemon and Pokemon species of the PokeAPI.
+
+    The paginated list endpoints are walked first, then all listed resources are fetched
+    concurrently through a rate-limited session. Progress is checkpointed to a JSON file
+    so an interrupted crawl resumes where it stopped, and fetched bodies go through the
+    response cache so a repeated crawl barely touches the network.
+    """
+
+    def __init__(self, base_url: str = POKEAPI_URL, checkpoint_path: str | None = DEFAULT_CHECKPOINT_PATH,
+                 cache: ResponseCache | None = None, session: requests.Session | None = None,
+                 rate: float | None = DEFAULT_RATE, max_workers: int = DEFAULT_MAX_WORKERS,
+                 page_size: int = DEFAULT_PAGE_SIZE, limiter: RateLimiter | None = None):
+        """
+        :param base_url: Root URL of the PokeAPI.
+        :param checkpoint_path: JSON file holding the crawl progress, None to keep it in memory.
+        :param cache: ResponseCache for the fetched resources, None to always hit the network.
+        :param session: Session to crawl with, a new pooled one if omitted.
+        :param rate: Maximum requests per second sent to the network, None for no limit.
+        :param max_workers: Maximum number of requests in flight.
+        :param page_size: Resources requested per page of the list endpoints.
+        :param limiter: RateLimiter shared with other clients, used instead of a limiter of `rate`.
+        """
+        self.base_url = base_url
+        self.checkpoint_path = checkpoint_path
+        self.cache = cache
+        self.max_workers = max_workers
+        self.page_size = page_size
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.limiter = limiter or RateLimiter(rate, max_concurrency=max_workers)
+        self.limiter.install(session)
+        self._lock = threading.Lock()
+        self.state = self._load()
+
+    def _load(self) -> dict:
+        state = None
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                state = json.load(f)
+        if not state or state.get("base_url") != self.base_url:
+            return {"base_url": self.base_url, "lists": {}, "fetched": {}, "failed": {}}
+        return state
+
+    def save(self):
+        """
+        Write the checkpoint atomically, an interrupted write never corrupts the previous one.
+        """
+        if not self.checkpoint_path:
+            return
+        if os.path.dirname(self.checkpoint_path):
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        with self._lock:
+            data = json.dumps(self.state)
+        with open(f"{self.checkpoint_path}.tmp", "w") as f:
+            f.write(data)
+        os.replace(f"{self.checkpoint_path}.tmp", self.checkpoint_path)
+
+    def _get(self, url: str) -> requests.Response:
+        if self.cache is not None:
+            return self.cache.get(self.session, url)
+        return self.session.get(url)
+
+    def list_endpoint(self, endpoint: str) -> dict:
+        """
+        Walk the pages of a list endpoint, resuming after the last checkpointed page.
+
+        :return: Resource id (as a string, like in the JSON checkpoint) -> name.
+        """
+        listing = self.state["lists"].setdefault(
+            endpoint, {"next": f"{self.base_url}/{endpoint}/?offset=0&limit={self.page_size}", "resources": {}})
+        while listing["next"] is not None:
+            response = self._get(listing["next"])
+            response.raise_for_status()
+            page = response.json()
+            with self._lock:
+                for resource in page["results"]:
+                    listing["resources"][str(resource_id(resource["url"]))] = resource["name"]
+                listing["next"] = page["next"]
+            self.save()
+        return listing["resources"]
+
+    def _fetch(self, endpoint: str, id: str):
+        response = self._get(f"{self.base_url}/{endpoint}/{id}/")
+        with self._lock:
+            if response.status_code == 200:
+                self.state["fetched"].setdefault(endpoint, {})[id] = \
+                    MODELS[endpoint].model_validate_json(response.content).name
+            else:
+                self.state["failed"].setdefault(endpoint, {})[id] = response.status_code
+
+    def crawl(self, endpoints=ENDPOINTS, limit: int | None = None) -> dict:
+        """
+        List and fetch every resource of `endpoints` not fetched by an earlier (interrupted) crawl.
+
+        :param limit: Only fetch the `limit` lowest ids of every endpoint.
+        :return: The crawl state: listed, fetched (id -> name) and failed (id -> HTTP status) resources.
+        """
+        try:
+            for endpoint in endpoints:
+                ids = sorted(self.list_endpoint(endpoint), key=int)[:limit]
+                done = set(self.state["fetched"].get(endpoint, {})) | set(self.state["failed"].get(endpoint, {}))
+                todo = [id for id in ids if id not in done]
+                with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pokeapi-crawl") as executor:
+                    for start in range(0, len(todo), CHECKPOINT_EVERY):
+                        list(executor.map(lambda id: self._fetch(endpoint, id), todo[start:start + CHECKPOINT_EVERY]))
+                        self.save()
+        finally:
+            self.save()
+        return self.state
+
+    def names(self, endpoint: str) -> dict[int, str]:
+        """
+        :return: Id -> name of the fetched resources of `endpoint`.
+        """
+        return {int(id): name for id, name in self.state["fetched"].get(endpoint, {}).items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl every Pokemon and species of the PokeAPI")
+    parser.add_argument("--base-url", default=POKEAPI_URL)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="progress file, resumed if present")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="response cache, empty to disable")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="network requests per second")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--limit", type=int, help="only fetch the lowest LIMIT ids of every endpoint")
+    args = parser.parse_args(argv)
+
+    cache = ResponseCache(SQLiteStore(args.cache_path) if args.cache_path else None)
+    crawler = PokeAPICrawler(args.base_url, args.checkpoint, cache, rate=args.rate, max_workers=args.workers)
+    state = crawler.crawl(limit=args.limit)
+    pokemon, species = crawler.names("pokemon"), crawler.names("pokemon-species")
+    mismatched = {id: (name, species[id]) for id, name in pokemon.items() if id in species and species[id] != name}
+    for endpoint in ENDPOINTS:
+        print(f"{endpoint}: {len(state['lists'][endpoint]['resources'])} listed, "
+              f"{len(state['fetched'].get(endpoint, {}))} fetched, {len(state['failed'].get(endpoint, {}))} failed")
+    print(f"{len(mismatched)} ids with different names on both endpoints: {mismatched}")
+    print(f"Cache stats: {cache.stats}")
+    return state
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+
+
+class NamedResource(BaseModel):
+    name: str
+    url: str
+
+
+class PokemonSpecies(BaseModel):
+    """
+    The parts of a /pokemon-species resource the tests use.
+
+    Fields that are not declared (flavor texts, names in every language, ...) are skipped
+    while validating, so they never become Python objects.
+    """
+    id: int
+    name: str
+    order: int | None = None
+    generation: NamedResource | None = None
+
+
+class Pokemon(BaseModel):
+    """
+    The parts of a /pokemon resource the tests use, without the large move and sprite lists.
+    """
+    id: int
+    name: str
+    order: int | None = None
+    height: int | None = None
+    weight: int | None = None
+    base_experience: int | None = None
+    species: NamedResource
+
+
+# Model of each PokeAPI endpoint, keyed by the endpoint name used in the URL
+MODELS = {
+    "pokemon": Pokemon,
+    "pokemon-species": PokemonSpecies,
+}
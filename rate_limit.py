@@ -0,0 +1,247 @@
+import email.utils
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+# Answers telling the client to slow down
+CONGESTION_STATUS_CODES = (429, 503)
+DEFAULT_BACKOFF = 0.5  # multiplicative decrease of the concurrency limit on congestion
+MAX_RETRY_AFTER = 60.0  # seconds, longer Retry-After values are capped
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled with `rate` tokens per second, holding at most `burst` tokens.
+
+    Callers reserve a token and sleep for the returned delay, so concurrent callers are
+    queued fairly instead of spinning.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token, possibly ahead of time.
+
+        :return: Seconds to wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+            self._updated = now
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, 0.0)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit: grows by one request per round of successful requests and is
+    multiplied by `backoff` whenever a request reports congestion.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, backoff: float = DEFAULT_BACKOFF):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.backoff = backoff
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= max(int(self.limit), self.minimum):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, congested: bool):
+        with self._condition:
+            self.in_flight -= 1
+            if congested:
+                self.limit = max(self.limit * self.backoff, self.minimum)
+            else:
+                self.limit = min(self.limit + 1 / self.limit, self.maximum)
+            self._condition.notify_all()
+
+
+class HostBudget:
+    """
+    Request budget of one host: token bucket, adaptive concurrency, Retry-After pause and counters.
+    """
+
+    def __init__(self, rate: float | None, burst: int, max_concurrency: int | None, min_concurrency: int):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency) if max_concurrency else None
+        self.paused_until = 0.0
+        self.requests = 0
+        self.congested = 0
+        self.throttled_s = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + min(seconds, MAX_RETRY_AFTER))
+
+    def wait(self) -> float:
+        """
+        Block until a request may be sent to the host.
+
+        :return: Seconds spent waiting.
+        """
+        started = time.monotonic()
+        pause = self.paused_until - started
+        if pause > 0:
+            time.sleep(pause)
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+            if delay:
+                time.sleep(delay)
+        return time.monotonic() - started
+
+
+class RateLimiter:
+    """
+    Client-side throttling shared by every session it is installed on.
+
+    Each host gets its own budget: a token bucket allowing `rate` requests per second with
+    bursts of `burst`, and optionally an AIMD concurrency limit between `min_concurrency`
+    and `max_concurrency`. 429/503 answers, including those retried away by urllib3,
+    shrink the concurrency limit, and a Retry-After header pauses the whole host.
+    The time requests spent waiting is counted per host in `stats()`.
+    """
+
+    def __init__(self, rate: float | None = None, burst: int = 1, host_rates: dict[str, float] | None = None,
+                 max_concurrency: int | None = None, min_concurrency: int = 1):
+        """
+        :param rate: Requests per second per host, None or 0 for no limit.
+        :param burst: Requests a host may receive at once after being idle.
+        :param host_rates: Requests per second of specific hosts ('host' or 'host:port' as in
+                           the URL), overriding `rate`.
+        :param max_concurrency: Upper bound of the adaptive concurrency limit per host, None for none.
+        :param min_concurrency: Lower bound of the adaptive concurrency limit.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def budget(self, host: str) -> HostBudget:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostBudget(self.host_rates.get(host, self.rate), self.burst,
+                                               self.max_concurrency, self.min_concurrency)
+            return self._hosts[host]
+
+    def acquire(self, host: str) -> tuple[HostBudget, float]:
+        """
+        Block until a request may be sent to `host`, every acquire must be followed by a release.
+
+        :return: The budget of the host and the seconds spent waiting.
+        """
+        budget = self.budget(host)
+        return budget, budget.wait()
+
+    def release(self, budget: HostBudget, waited: float, response: requests.Response | None = None):
+        """
+        Give the request slot back, adapting the host limits to the `response` (None if it failed).
+        """
+        congested = response is not None and self._congested(budget, response)
+        if budget.concurrency is not None:
+            budget.concurrency.release(congested)
+        with budget._lock:
+            budget.requests += 1
+            budget.throttled_s += waited
+            budget.congested += congested
+
+    @staticmethod
+    def _congested(budget: HostBudget, response: requests.Response) -> bool:
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        statuses = [entry.status for entry in getattr(retries, "history", ())] + [response.status_code]
+        if response.status_code in CONGESTION_STATUS_CODES:
+            seconds = retry_after_seconds(response.headers.get("Retry-After"))
+            if seconds:
+                budget.pause(seconds)
+        return any(status in CONGESTION_STATUS_CODES for status in statuses)
+
+    def stats(self) -> list[dict]:
+        """
+        :return: Per host request count, congestion signals, throttled time and current concurrency limit.
+        """
+        with self._lock:
+            hosts = dict(self._hosts)
+        return [{"host": host, "requests": budget.requests, "congested": budget.congested,
+                 "throttled_s": budget.throttled_s,
+                 "concurrency_limit": budget.concurrency.limit if budget.concurrency else None}
+                for host, budget in sorted(hosts.items())]
+
+    def _throttles(self, adapter: BaseAdapter) -> bool:
+        """
+        Whether `adapter`, or an adapter it wraps, already sends within the budgets of this limiter.
+        """
+        while adapter is not None:
+            if isinstance(adapter, RateLimitAdapter) and adapter.limiter is self:
+                return True
+            adapter = getattr(adapter, "wrapped", None)
+        return False
+
+    def install(self, session: requests.Session):
+        """
+        Throttle every request sent through `session`.
+
+        Installing a limiter on a session throttled by another one chains them, a request
+        is sent within the budgets of both.
+        """
+        for prefix, adapter in list(session.adapters.items()):
+            if not self._throttles(adapter):
+                session.mount(prefix, RateLimitAdapter(self, adapter))
+
+
+class RateLimitAdapter(BaseAdapter):
+    """
+    Transport adapter sending through the wrapped adapter within the host budget of the rate limiter.
+    """
+
+    def __init__(self, limiter: RateLimiter, wrapped: BaseAdapter):
+        super().__init__()
+        self.limiter = limiter
+        self.wrapped = wrapped
+
+    def send(self, request, **kwargs):
+        budget, waited = self.limiter.acquire(urlsplit(request.url).netloc)
+        response = None
+        try:
+            response = self.wrapped.send(request, **kwargs)
+            return response
+        finally:
+            self.limiter.release(budget, waited, response)
+
+    def close(self):
+        self.wrapped.close()
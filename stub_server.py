@@ -0,0 +1,248 @@
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse
+
+# First generation Pokémon, index + 1 is the national dex id
+POKEMON_NAMES = [
+    "bulbasaur", "ivysaur", "venusaur", "charmander", "charmeleon", "charizard", "squirtle", "wartortle",
+    "blastoise", "caterpie", "metapod", "butterfree", "weedle", "kakuna", "beedrill", "pidgey", "pidgeotto",
+    "pidgeot", "rattata", "raticate", "spearow", "fearow", "ekans", "arbok", "pikachu", "raichu", "sandshrew",
+    "sandslash", "nidoran-f", "nidorina", "nidoqueen", "nidoran-m", "nidorino", "nidoking", "clefairy",
+    "clefable", "vulpix", "ninetales", "jigglypuff", "wigglytuff", "zubat", "golbat", "oddish", "gloom",
+    "vileplume", "paras", "parasect", "venonat", "venomoth", "diglett", "dugtrio", "meowth", "persian",
+    "psyduck", "golduck", "mankey", "primeape", "growlithe", "arcanine", "poliwag", "poliwhirl", "poliwrath",
+    "abra", "kadabra", "alakazam", "machop", "machoke", "machamp", "bellsprout", "weepinbell", "victreebel",
+    "tentacool", "tentacruel", "geodude", "graveler", "golem", "ponyta", "rapidash", "slowpoke", "slowbro",
+    "magnemite", "magneton", "farfetchd", "doduo", "dodrio", "seel", "dewgong", "grimer", "muk", "shellder",
+    "cloyster", "gastly", "haunter", "gengar", "onix", "drowzee", "hypno", "krabby", "kingler", "voltorb",
+    "electrode", "exeggcute", "exeggutor", "cubone", "marowak", "hitmonlee", "hitmonchan", "lickitung",
+    "koffing", "weezing", "rhyhorn", "rhydon", "chansey", "tangela", "kangaskhan", "horsea", "seadra",
+    "goldeen", "seaking", "staryu", "starmie", "mr-mime", "scyther", "jynx", "electabuzz", "magmar", "pinsir",
+    "tauros", "magikarp", "gyarados", "lapras", "ditto", "eevee", "vaporeon", "jolteon", "flareon", "porygon",
+    "omanyte", "omastar", "kabuto", "kabutops", "aerodactyl", "snorlax", "articuno", "zapdos", "moltres",
+    "dratini", "dragonair", "dragonite", "mewtwo", "mew",
+]
+
+PET_STATUSES = ("available", "pending", "sold")
+
+# Search box page for the browser engines: typing lists the matching Pokemon names as links
+SEARCH_PAGE = """<!DOCTYPE html>
+<html><body>
+<input placeholder="Search">
+<div id="results"></div>
+<script>
+const names = %s;
+document.querySelector("input").addEventListener("input", event => {
+  const term = event.target.value.toLowerCase();
+  document.getElementById("results").innerHTML = term ? names.filter(name => name.includes(term))
+    .map(name => `<a href="/web/pokemon/${name}"><span class="text-blue-400">${name}</span></a>`).join("") : "";
+});
+</script>
+</body></html>"""
+
+# Initial Petstore content, the fourth 'available' pet is 'Puff' like on the public demo store
+SEED_PETS = [
+    (1, "doggie", "Dogs", "available"),
+    (2, "Rex", "Dogs", "available"),
+    (3, "Bella", "Cats", "available"),
+    (4, "Puff", "Dragons", "available"),
+    (5, "Nemo", "Fish", "pending"),
+    (6, "Max", "Dogs", "sold"),
+    (7, "Luna", "Cats", "sold"),
+]
+
+
+class PetStore:
+    """
+    In-memory pet storage with a secondary index on status.
+
+    The status index keeps insertion order per status, so findByStatus answers in
+    O(matches) and returns pets in the order they were stored.
+    """
+
+    def __init__(self):
+        self.pets = {}
+        self.by_status = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, pet: dict, merge: bool = False) -> dict:
+        """
+        Store `pet`, with `merge` its fields are applied to the stored pet instead of replacing it.
+        """
+        with self._lock:
+            old = self.pets.get(pet["id"])
+            if old is not None:
+                self.by_status.get(old.get("status"), {}).pop(pet["id"], None)
+                if merge:
+                    pet = {**old, **pet}
+            self.pets[pet["id"]] = pet
+            self.by_status.setdefault(pet.get("status"), {})[pet["id"]] = None
+        return pet
+
+    def get(self, pet_id: int) -> dict | None:
+        return self.pets.get(pet_id)
+
+    def delete(self, pet_id: int) -> dict | None:
+        with self._lock:
+            pet = self.pets.pop(pet_id, None)
+            if pet is not None:
+                self.by_status.get(pet.get("status"), {}).pop(pet_id, None)
+        return pet
+
+    def find_by_status(self, statuses: list[str]) -> list[dict]:
+        with self._lock:
+            return [self.pets[pet_id] for status in statuses for pet_id in self.by_status.get(status, {})]
+
+
+def _pokemon_id(id_or_name: str) -> int:
+    if id_or_name.isdigit() and 1 <= int(id_or_name) <= len(POKEMON_NAMES):
+        return int(id_or_name)
+    if id_or_name in POKEMON_NAMES:
+        return POKEMON_NAMES.index(id_or_name) + 1
+    raise HTTPException(status_code=404, detail="Not Found")
+
+
+def create_app(latency: float = 0.0, error_rate: float = 0.0, seed: int | None = None) -> FastAPI:
+    """
+    Build the stand-in application serving the Petstore (/v2) and PokeAPI (/api/v2) routes, and a
+    search box page (/web/search) for the browser engines.
+
+    :param latency: Seconds added to every response.
+    :param error_rate: Probability (0..1) of answering 503 instead of handling the request.
+    :param seed: Seed for the error injection, for reproducible runs.
+    """
+    app = FastAPI()
+    app.state.latency = latency
+    app.state.error_rate = error_rate
+    app.state.random = random.Random(seed)
+    app.state.store = store = PetStore()
+    for pet_id, name, category, status in SEED_PETS:
+        store.upsert({"id": pet_id, "name": name, "category": {"id": 1, "name": category},
+                      "photoUrls": [], "tags": [], "status": status})
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if app.state.latency:
+            await asyncio.sleep(app.state.latency)
+        if app.state.error_rate and app.state.random.random() < app.state.error_rate:
+            return JSONResponse({"code": 503, "type": "error", "message": "Injected failure"}, status_code=503)
+        return await call_next(request)
+
+    @app.post("/v2/pet")
+    async def add_pet(pet: dict):
+        if not isinstance(pet.get("id"), int):
+            return JSONResponse({"code": 405, "type": "unknown", "message": "Invalid input"}, status_code=405)
+        return store.upsert(pet)
+
+    @app.put("/v2/pet")
+    async def update_pet(pet: dict):
+        if not isinstance(pet.get("id"), int):
+            return JSONResponse({"code": 400, "type": "unknown", "message": "Invalid ID supplied"}, status_code=400)
+        # Status-only updates keep the name and photo URLs the contract requires
+        return store.upsert(pet, merge=True)
+
+    @app.get("/v2/pet/findByStatus")
+    async def find_pets_by_status(status: list[str] = Query(...)):
+        if not set(status) <= set(PET_STATUSES):
+            return JSONResponse({"code": 400, "type": "unknown", "message": "Invalid status value"}, status_code=400)
+        return store.find_by_status(status)
+
+    @app.get("/v2/pet/{pet_id}")
+    async def get_pet(pet_id: int):
+        pet = store.get(pet_id)
+        if pet is None:
+            return JSONResponse({"code": 1, "type": "error", "message": "Pet not found"}, status_code=404)
+        return pet
+
+    @app.delete("/v2/pet/{pet_id}")
+    async def delete_pet(pet_id: int):
+        if store.delete(pet_id) is None:
+            return JSONResponse(None, status_code=404)
+        return {"code": 200, "type": "unknown", "message": str(pet_id)}
+
+    def named_resource_list(request: Request, endpoint: str, limit: int, offset: int) -> dict:
+        url = f"{str(request.base_url).rstrip('/')}/api/v2/{endpoint}/"
+        page = range(offset + 1, min(offset + limit, len(POKEMON_NAMES)) + 1)
+        return {
+            "count": len(POKEMON_NAMES),
+            "next": f"{url}?offset={offset + limit}&limit={limit}" if offset + limit < len(POKEMON_NAMES) else None,
+            "previous": f"{url}?offset={max(offset - limit, 0)}&limit={limit}" if offset > 0 else None,
+            "results": [{"name": POKEMON_NAMES[pokemon_id - 1], "url": f"{url}{pokemon_id}/"} for pokemon_id in page],
+        }
+
+    @app.get("/api/v2/pokemon/")
+    async def list_pokemon(request: Request, limit: int = 20, offset: int = 0):
+        return named_resource_list(request, "pokemon", limit, offset)
+
+    @app.get("/api/v2/pokemon-species/")
+    async def list_pokemon_species(request: Request, limit: int = 20, offset: int = 0):
+        return named_resource_list(request, "pokemon-species", limit, offset)
+
+    @app.get("/api/v2/pokemon/{id_or_name}/")
+    async def get_pokemon(id_or_name: str):
+        pokemon_id = _pokemon_id(id_or_name)
+        name = POKEMON_NAMES[pokemon_id - 1]
+        return {"id": pokemon_id, "name": name,
+                "species": {"name": name, "url": f"/api/v2/pokemon-species/{pokemon_id}/"}}
+
+    @app.get("/api/v2/pokemon-species/{id_or_name}/")
+    async def get_pokemon_species(id_or_name: str):
+        pokemon_id = _pokemon_id(id_or_name)
+        return {"id": pokemon_id, "name": POKEMON_NAMES[pokemon_id - 1]}
+
+    @app.get("/web/search", response_class=HTMLResponse)
+    async def search_page():
+        return SEARCH_PAGE % json.dumps(POKEMON_NAMES)
+
+    @app.get("/web/pokemon/{name}", response_class=HTMLResponse)
+    async def pokemon_page(name: str):
+        return f"<!DOCTYPE html><html><body><h1>{POKEMON_NAMES[_pokemon_id(name) - 1]}</h1></body></html>"
+
+    return app
+
+
+class StubServer:
+    """
+    Runs the stand-in application with uvicorn on a background thread and a random free port.
+    """
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1"):
+        self.app = app
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Accepted connections inherit TCP_NODELAY: without it every keep-alive request waits
+        # ~40ms for a delayed ACK (Nagle) before the response is sent
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.bind((host, 0))
+        self.url = f"http://{host}:{self._socket.getsockname()[1]}"
+        self.petstore_url = f"{self.url}/v2"
+        self.pokeapi_url = f"{self.url}/api/v2"
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._socket]},
+                                        daemon=True)
+
+    def start(self, timeout: float = 10.0):
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Stub server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join()
+        self._socket.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
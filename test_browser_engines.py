@@ -0,0 +1,114 @@
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from browser_engines import PlaywrightEngine, PlaywrightPage, SeleniumEngine, SeleniumPage
+from element_waits import ElementWaiter
+from fake_webdriver import FakeDriver
+from stub_server import StubServer, create_app
+from webdriver_pool import WebDriverPool
+
+SEARCH_INPUT_XPATH = "//input[@placeholder='Search']"
+
+
+class FakeWaiter:
+    """
+    Stand-in for an ElementWaiter answering every XPath from a dict of fake elements.
+    """
+
+    def __init__(self, elements: dict):
+        self.elements = elements
+
+    def wait_for_elements(self, driver, xpath, min_count=1):
+        return self.elements.get(xpath, [])
+
+    def wait_for_url_change(self, driver, old_url):
+        return driver.current_url != old_url
+
+
+class FakeInput:
+    def __init__(self):
+        self.value = ""
+
+    def clear(self):
+        self.value = ""
+
+    def send_keys(self, text):
+        self.value += text
+
+
+def test_selenium_page_fills_and_clears_input():
+    search_input = FakeInput()
+    page = SeleniumPage(FakeDriver(), FakeWaiter({"//input": [search_input]}))
+    page.fill("//input", "Keyboard")
+    page.fill("//input", "Air Fryer")
+    assert search_input.value == "Air Fryer"
+    page.clear("//input")
+    assert search_input.value == ""
+
+
+def test_selenium_page_missing_input_raises():
+    page = SeleniumPage(FakeDriver(), FakeWaiter({}))
+    with pytest.raises(NoSuchElementException):
+        page.fill("//input", "Keyboard")
+
+
+def test_selenium_engine_leases_pages_from_pool():
+    pool = WebDriverPool(FakeDriver, size=2)
+    engine = SeleniumEngine(pool, FakeWaiter({}))
+    with engine.lease() as page:
+        assert isinstance(page, SeleniumPage)
+    assert engine.map(lambda page, item: (page.driver.worker in (0, 1), item), ["a", "b", "c"]) == \
+        [(True, "a"), (True, "b"), (True, "c")]
+    engine.close()
+    pool.close()
+    assert sum(row["leases"] for row in pool.utilization()) == 4
+
+
+@pytest.fixture(scope="module")
+def playwright_search():
+    """
+    PlaywrightEngine of two concurrent pages on the search page of the stand-in server.
+    """
+    pytest.importorskip("playwright.async_api")
+    with StubServer(create_app()) as server:
+        try:
+            engine = PlaywrightEngine(2, f"{server.url}/web/search", ElementWaiter(timeout=2))
+        except Exception as e:  # the package is installed but not its Chromium build
+            pytest.skip(f"Playwright cannot launch Chromium: {e}")
+        yield engine
+        engine.close()
+
+
+def results_xpath(term: str) -> str:
+    return f"//span[contains(@class, 'text-blue-400') and contains(text(), '{term}')]"
+
+
+def test_playwright_page_searches_and_follows_results(playwright_search):
+    with playwright_search.lease() as page:
+        assert isinstance(page, PlaywrightPage)
+        assert page.current_url.endswith("/web/search")
+        page.fill(SEARCH_INPUT_XPATH, "char")
+        results = page.elements(results_xpath("char"), min_count=3)
+        assert [result.text for result in results] == ["charmander", "charmeleon", "charizard"]
+        search_url = page.current_url
+        results[0].click()
+        assert page.wait_for_url_change(search_url)
+        assert page.current_url.endswith("/web/pokemon/charmander")
+
+
+def test_playwright_wait_returns_partial_matches_on_timeout(playwright_search):
+    with playwright_search.lease() as page:
+        page.fill(SEARCH_INPUT_XPATH, "pika")
+        assert len(page.elements(results_xpath("pika"), min_count=5)) == 1
+        page.clear(SEARCH_INPUT_XPATH)
+        assert page.elements(results_xpath("pika"), min_count=1) == []
+
+
+def test_playwright_map_uses_a_fresh_context_per_lease(playwright_search):
+    def search(page, term):
+        page.fill(SEARCH_INPUT_XPATH, term)
+        return len(page.elements(results_xpath(term))), page.page.context
+
+    (bulbasaur, first), (squirtle, second) = playwright_search.map(search, ["bulba", "squirt"])
+    assert (bulbasaur, squirtle) == (1, 1)
+    assert first is not second
@@ -1,7 +1,101 @@
 import requests
-import json
-import random
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pokeapi_cache import ResponseCache
+from pokeapi_crawler import DEFAULT_CHECKPOINT_PATH, DEFAULT_RATE, PokeAPICrawler, crawled_ids, sample_ids
+from pokeapi_models import MODELS, Pokemon, PokemonSpecies
+
+
+POKEAPI_URL = "https://pokeapi.co/api/v2"
+DEFAULT_MAX_WORKERS = 16
+# Ids sampled from when no full crawl of the PokeAPI is checkpointed (see pokeapi_crawler.py)
+DEFAULT_SAMPLE_POPULATION = range(1, 51)
+
+# Shared keep-alive session, sized so every comparison worker gets its own pooled connection.
+# Throttling answers are retried after their Retry-After delay instead of failing the test;
+# with --rate-limit / --max-concurrency the shared RateLimiter also slows down on them.
+session = requests.Session()
+_adapter = HTTPAdapter(pool_maxsize=DEFAULT_MAX_WORKERS * 2,
+                       max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 503),
+                                         respect_retry_after_header=True, raise_on_status=False))
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+# Responses are cached in memory so repeated fetches within a run skip the network,
+# --pokeapi-cache adds an on-disk store shared by runs (see route_http_traffic)
+cache = ResponseCache()
+
+
+@dataclass
+class PokemonNameReport:
+    """
+        Result of comparing Pokemon names between the 'pokemon' and 'pokemon-species' endpoints.
+
+        matched: id -> name for ids where both endpoints agree.
+        mismatched: id -> (name from 'pokemon', name from 'pokemon-species').
+        missing: ids that one of the endpoints could not serve.
+    """
+    matched: dict = field(default_factory=dict)
+    mismatched: dict = field(default_factory=dict)
+    missing: list = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatched and not self.missing
+
+    def result(self, id) -> bool | None:
+        """
+            :return: True if the names for `id` match, False if they differ, None if unavailable.
+        """
+        if id in self.matched:
+            return True
+        if id in self.mismatched:
+            return False
+        return None
+
+
+def fetch_pokemon_name(id, api_type: str) -> str | None:
+    """
+        Retrieves the name of a Pokemon from a single PokeAPI endpoint.
+        :param id: The ID of the Pokemon.
+        :param api_type: The endpoint to query ('pokemon' or 'pokemon-species').
+        :return: The name, or None if the endpoint did not return it.
+    """
+    url = f"{POKEAPI_URL}/{api_type}/{id}/"
+    response = cache.get(session, url)
+    if response.status_code != 200:
+        print(f"Error - Unable to retrieve data from {url}")
+        return None
+    return MODELS[api_type].model_validate_json(response.content).name
+
+
+def compare_pokemon_batch(ids, max_workers: int = DEFAULT_MAX_WORKERS) -> PokemonNameReport:
+    """
+        Compares the Pokemon names from the 'pokemon' and 'pokemon-species' endpoints for many ids.
+
+        Both endpoints of every id are requested concurrently on a thread pool of `max_workers`
+        threads sharing one keep-alive session, instead of two sequential round trips per id.
+
+        :param ids: Iterable (list, range, ...) of Pokemon ids to compare.
+        :param max_workers: Maximum number of requests in flight.
+        :return: A PokemonNameReport with matched, mismatched and missing ids.
+    """
+    ids = list(ids)
+    report = PokemonNameReport()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pokemon_names = executor.map(fetch_pokemon_name, ids, ["pokemon"] * len(ids))
+        species_names = executor.map(fetch_pokemon_name, ids, ["pokemon-species"] * len(ids))
+        for id, pokemon_name, species_name in zip(ids, pokemon_names, species_names):
+            if pokemon_name is None or species_name is None:
+                report.missing.append(id)
+            elif pokemon_name == species_name:
+                report.matched[id] = pokemon_name
+            else:
+                report.mismatched[id] = (pokemon_name, species_name)
+    return report
 
 
 def compare_pokemon_names(id: str | None):
@@ -10,60 +104,81 @@ def compare_pokemon_names(id: str | None):
         :param id: The ID of the Pokemon to compare.
         :return: True if the names obtained from both endpoints match, False otherwise.
     """
-    # Make API call to retrieve Pokemon name from the first endpoint
-    pokemon_url = f"https://pokeapi.co/api/v2/pokemon/{id}/"
-    response_pokemon = requests.get(pokemon_url)
-    if response_pokemon.status_code != 200:
-        print(f"Error - Unable to retrieve data from {pokemon_url}")
-        return None
-    pokemon_data = response_pokemon.json()
-    pokemon_name_pokemon_endpoint = pokemon_data['name']
-
-    # Make API call to retrieve Pokemon name from the second endpoint
-    species_url = f"https://pokeapi.co/api/v2/pokemon-species/{id}/"
-    response_species = requests.get(species_url)
-    if response_species.status_code != 200:
-        print(f"Error - Unable to retrieve data from {species_url}")
-        return None
-    species_data = response_species.json()
-    pokemon_name_species_endpoint = species_data['name']
-
-    # Compare the names obtained from both endpoints
-    if pokemon_name_pokemon_endpoint == pokemon_name_species_endpoint:
-        print(f"The Pokémon name from both endpoints is: {pokemon_name_pokemon_endpoint}")
-        return True
-    else:
+    report = compare_pokemon_batch([id], max_workers=2)
+    result = report.result(id)
+    if result:
+        print(f"The Pokémon name from both endpoints is: {report.matched[id]}")
+    elif result is False:
+        pokemon_name_pokemon_endpoint, pokemon_name_species_endpoint = report.mismatched[id]
         print("Error - The Pokémon names obtained from both endpoints do not match.")
         print(f"Name from Pokemon endpoint: {pokemon_name_pokemon_endpoint}")
         print(f"Name from Species endpoint: {pokemon_name_species_endpoint}")
-        return False
+    return result
 
 
-def generate_random_id():
+def pytest_generate_tests(metafunc):
     """
-        Generates a random Pokémon ID between 1 and 50.
+        Parametrizes `sampled_pokemon_id` with a seeded sample of Pokémon ids.
 
-        This function generates a random integer representing a Pokémon ID.
-        The generated ID falls within the range of IDs available in the Pokémon database,
-        which is between 1 and 50.
-
-        :return: Randomly generated Pokémon ID.
+        The ids are drawn from the whole dex once `python pokeapi_crawler.py` has checkpointed
+        a full crawl of pokeapi.co, otherwise (and against the stand-in server) from ids 1 to 50.
+        The same --pokemon-seed always samples the same --pokemon-sample ids.
     """
-    return random.randint(1, 50)
+    if "sampled_pokemon_id" not in metafunc.fixturenames:
+        return
+    config = metafunc.config
+    checkpoint = str(config.rootpath / DEFAULT_CHECKPOINT_PATH)  # the crawler is run from the rootdir
+    population = None if config.getoption("--stub-server") else crawled_ids(checkpoint)
+    ids = sample_ids(population or DEFAULT_SAMPLE_POPULATION, config.getoption("--pokemon-sample"),
+                     config.getoption("--pokemon-seed"))
+    metafunc.parametrize("sampled_pokemon_id", ids)
 
 
-def pokeapi_get(type_id_or_name: str, api_type: str = "pokemon-species") -> json:
+def pokeapi_get(type_id_or_name: str, api_type: str = "pokemon-species") -> Pokemon | PokemonSpecies:
     """
     This function perform API calls
     :param type_id_or_name:
-    :param api_type:
-    :return:
+    :param api_type: 'pokemon-species' or 'pokemon'.
+    :return: The resource validated straight from the response bytes into its model.
     """
-    url = f"https://pokeapi.co/api/v2/{api_type}/{type_id_or_name}/"
-    # Make the API call
-    response = requests.get(url)
+    url = f"{POKEAPI_URL}/{api_type}/{type_id_or_name}/"
+    # Make the API call, served from the response cache when possible
+    response = cache.get(session, url)
     response.raise_for_status()
-    return response.json()
+    return MODELS[api_type].model_validate_json(response.content)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def route_http_traffic(http_cassette, stub_server, configure_http_session, pokeapi_response_store, impact_plugin):
+    """
+    Applies the command line HTTP options to the shared session and routes it
+    to the stand-in server when --stub-server is given.
+
+    The on-disk store of --pokeapi-cache only backs the response cache against the
+    live API, otherwise cached resources would never reach the cassette and stub
+    responses would outlive the run. With --impact, responses served from the cache
+    are reported like those received by the session.
+    """
+    configure_http_session(session)
+    cache.memory.clear()
+    with pytest.MonkeyPatch.context() as mp:
+        if stub_server:
+            mp.setattr(f"{__name__}.POKEAPI_URL", stub_server.pokeapi_url)
+        if not http_cassette and not stub_server:
+            mp.setattr(cache, "store", pokeapi_response_store)
+        if impact_plugin:
+            mp.setattr(cache, "on_hit", impact_plugin.observe_cached)
+        yield
+    cache.memory.clear()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def report_cache_stats():
+    """
+    Prints the response cache hit/miss counters once the module has finished.
+    """
+    yield
+    print(f"PokeAPI cache stats: {cache.stats}")
 
 
 @pytest.mark.parametrize("type_id_or_name, api_type, name", [
@@ -84,7 +199,7 @@ def test_smoke(
     body = pokeapi_get(type_id_or_name, api_type)
     if name:
         assert body, "returned JSON is empty"
-        assert name == body['name'], f'wrong result: expected {name} got {body["name"]}'
+        assert name == body.name, f'wrong result: expected {name} got {body.name}'
     else:
         assert not body, 'Got response body - not as expected'
 
@@ -122,8 +237,8 @@ def test_compare_id(pokemon_id: str):
     body_pokemon = pokeapi_get(pokemon_id, "pokemon")
 
     # Extract Pokémon names from the responses
-    pokemon_name_from_types = body_pokemon_types["name"]
-    pokemon_name_from_pokemon = body_pokemon["name"]
+    pokemon_name_from_types = body_pokemon_types.name
+    pokemon_name_from_pokemon = body_pokemon.name
 
     # Compare retrieved Pokémon names
     assert pokemon_name_from_types == pokemon_name_from_pokemon, \
@@ -131,16 +246,14 @@ def test_compare_id(pokemon_id: str):
         f"and 'pokemon' endpoint ({pokemon_name_from_pokemon}) are not the same"
 
 
+def test_compare_pokemon_names_sampled(sampled_pokemon_id: int):
+    """
+        Compares the names from both endpoints for every id of the seeded sample.
+    """
+    assert compare_pokemon_names(sampled_pokemon_id) is True
+
+
 @pytest.mark.parametrize("pokemon_id, expected_result", [
-    (generate_random_id(), True),
-    (generate_random_id(), True),
-    (generate_random_id(), True),
-    (generate_random_id(), True),
-    (generate_random_id(), True),
-    (generate_random_id(), True),
-    (generate_random_id(), True),
-    (generate_random_id(), True),
-    (generate_random_id(), True),
     (5000, None)  # Non-existent Pokémon ID - None should be returned
 ])
 def test_compare_pokemon_names(pokemon_id: str, expected_result: str):
@@ -157,3 +270,31 @@ def test_compare_pokemon_names(pokemon_id: str, expected_result: str):
     """
     assert compare_pokemon_names(pokemon_id) == expected_result
 
+
+def test_compare_pokemon_names_batch():
+    """
+        Compares the names from both endpoints for the first 50 Pokémon in one concurrent sweep.
+    """
+    report = compare_pokemon_batch(range(1, 51))
+    assert not report.mismatched, f"Names differ between endpoints: {report.mismatched}"
+    assert not report.missing, f"Pokémon not available from both endpoints: {report.missing}"
+    assert len(report.matched) == 50
+
+
+def test_crawl_pokedex_resumes_from_checkpoint(tmp_path, configure_http_session, stub_server):
+    """
+        Crawls the first Pokémon of both list endpoints in two interrupted steps and compares their names.
+    """
+    checkpoint = str(tmp_path / "crawl.json")
+
+    def crawler():
+        return PokeAPICrawler(POKEAPI_URL, checkpoint, cache, configure_http_session(requests.Session()),
+                              rate=None if stub_server else DEFAULT_RATE)
+
+    crawler().crawl(limit=10)
+    resumed = crawler()
+    assert len(resumed.names("pokemon")) == 10
+    resumed.crawl(limit=30)
+    pokemon, species = resumed.names("pokemon"), resumed.names("pokemon-species")
+    assert sorted(pokemon) == sorted(species) == list(range(1, 31))
+    assert pokemon == species
@@ -0,0 +1,42 @@
+import time
+
+from selenium.common.exceptions import JavascriptException
+from element_waits import ElementWaiter
+
+
+class PollingOnlyDriver:
+    """
+    Fake driver refusing scripts, whose elements show up after `delay` seconds.
+    """
+
+    def __init__(self, delay: float, elements: int = 3):
+        self.ready_at = time.perf_counter() + delay
+        self.elements = elements
+        self.current_url = "https://example.com/"
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def execute_async_script(self, script, *args):
+        raise JavascriptException("scripts disabled")
+
+    def find_elements(self, by, xpath):
+        return ["element"] * self.elements if time.perf_counter() >= self.ready_at else []
+
+
+def test_wait_returns_as_soon_as_elements_appear():
+    waiter = ElementWaiter(timeout=5, poll_frequency=0.01)
+    waiter.current_test = "test"
+    started = time.perf_counter()
+    assert len(waiter.wait_for_elements(PollingOnlyDriver(delay=0.1), "//span", min_count=2)) == 3
+    assert time.perf_counter() - started < 1
+    assert 0.1 <= waiter.spent["test"] < 1
+
+
+def test_wait_times_out_and_reports_budget():
+    waiter = ElementWaiter(timeout=0.2, poll_frequency=0.01)
+    waiter.current_test = "slow"
+    assert waiter.wait_for_elements(PollingOnlyDriver(delay=10), "//span") == []
+    assert not waiter.wait_for_url_change(PollingOnlyDriver(delay=0), "https://example.com/", timeout=0.1)
+    [(test, spent, over_budget)] = waiter.report(budget=0.1)
+    assert test == "slow" and spent >= 0.3 and over_budget
@@ -0,0 +1,70 @@
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from http_cassette import Cassette, CassetteMissError, RECORD, REPLAY
+
+
+URL = "https://pokeapi.co/api/v2/pokemon/25/"
+
+
+class StubAdapter(BaseAdapter):
+    """
+    Adapter answering every request with a canned JSON body instead of using the network.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers["Content-Type"] = "application/json"
+        response._content = f'{{"name": "pikachu", "call": {self.calls}}}'.encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def make_session(cassette: Cassette) -> tuple[requests.Session, StubAdapter]:
+    session = requests.Session()
+    stub = StubAdapter()
+    session.mount("https://", stub)
+    cassette.install(session)
+    return session, stub
+
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "http.json.gz")
+    recorder = Cassette(path, RECORD)
+    session, _ = make_session(recorder)
+    assert session.get(URL).json()["call"] == 1
+    assert session.get(URL).json()["call"] == 2
+    recorder.save()
+
+    player = Cassette(path, REPLAY)
+    session, stub = make_session(player)
+    assert [session.get(URL).json()["call"] for _ in range(2)] == [1, 2]
+    assert stub.calls == 0
+    assert not player.unused and not player.missing
+
+
+def test_replay_is_strict(tmp_path):
+    path = str(tmp_path / "http.json.gz")
+    recorder = Cassette(path, RECORD)
+    session, _ = make_session(recorder)
+    session.get(URL)
+    session.post(URL, json={"id": 1})
+    recorder.save()
+
+    player = Cassette(path, REPLAY)
+    session, _ = make_session(player)
+    with pytest.raises(CassetteMissError):
+        session.post(URL, json={"id": 2})
+    assert len(player.missing) == 1 and player.missing[0].startswith(f"POST {URL}")
+    assert len(player.unused) == 2
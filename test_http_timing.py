@@ -0,0 +1,31 @@
+import json
+
+import requests
+from http_timing import TimingRecorder, endpoint_of
+from stub_server import StubServer, create_app
+
+
+def test_endpoint_of_groups_ids():
+    assert endpoint_of("GET", "https://pokeapi.co/api/v2/pokemon/25/") == "GET pokeapi.co/api/v2/pokemon/{id}/"
+    assert endpoint_of("GET", "https://petstore.swagger.io/v2/pet/findByStatus?status=sold") == \
+        "GET petstore.swagger.io/v2/pet/findByStatus"
+
+
+def test_recorder_times_every_call(tmp_path):
+    recorder = TimingRecorder()
+    recorder.current_test = "test_recorder_times_every_call"
+    with StubServer(create_app(latency=0.01)) as server, requests.Session() as session:
+        recorder.install(session)
+        for pokemon_id in (1, 2, 3):
+            session.get(f"{server.pokeapi_url}/pokemon/{pokemon_id}/").raise_for_status()
+
+    first, *rest = recorder.records
+    assert first["connect_ms"] > 0
+    assert all(record["connect_ms"] == 0 for record in rest), "pooled connection should be reused"
+    assert all(record["total_ms"] >= record["ttfb_ms"] >= 10 for record in recorder.records)
+    [endpoint] = recorder.endpoints()
+    assert endpoint["calls"] == 3
+
+    path = tmp_path / "timing.json"
+    recorder.write(str(path))
+    assert len(json.loads(path.read_text())["calls"]) == 3
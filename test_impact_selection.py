@@ -0,0 +1,157 @@
+import os
+import pathlib
+import time
+import types
+
+import requests
+from requests.adapters import BaseAdapter
+from impact_selection import CACHE_KEY, DEFAULT_TTL, SKIP, ImpactAdapter, ImpactPlugin, SourceGraph
+from pokeapi_cache import ResponseCache
+from stub_server import StubServer, create_app
+
+
+class StubCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+class StubConfig:
+    """
+    The parts of pytest.Config the plugin reads, independent of the options of the current run.
+    """
+
+    def __init__(self, rootpath: pathlib.Path, cache: StubCache | None = None, **options):
+        self.rootpath = rootpath
+        if cache is not None:
+            self.cache = cache
+        self.option = types.SimpleNamespace(impact=SKIP, impact_ttl=DEFAULT_TTL, **options)
+
+    def getoption(self, name):
+        return getattr(self.option, name.lstrip("-").replace("-", "_"))
+
+
+class FixedAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"name": "pikachu"}'
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_source_graph_follows_imports(tmp_path):
+    (tmp_path / "app.py").write_text("import helpers\n")
+    (tmp_path / "helpers.py").write_text("from models import Pet\n")
+    (tmp_path / "models.py").write_text("Pet = dict\n")
+    (tmp_path / "unrelated.py").write_text("import os\n")
+    graph = SourceGraph(str(tmp_path))
+    assert {os.path.basename(file) for file in graph.dependencies(str(tmp_path / "app.py"))} == \
+        {"app.py", "helpers.py", "models.py"}
+    assert graph.dependencies(str(tmp_path / "unrelated.py")) == {str(tmp_path / "unrelated.py")}
+    before = graph.file_hash(str(tmp_path / "models.py"))
+    (tmp_path / "models.py").write_text("Pet = list\n")
+    assert SourceGraph(str(tmp_path)).file_hash(str(tmp_path / "models.py")) != before
+
+
+def test_code_dependencies_follow_global_names():
+    def fixture():
+        return StubServer(create_app())
+
+    graph = SourceGraph(os.path.dirname(os.path.abspath(__file__)))
+    files = {graph.relative(file) for file in graph.code_dependencies(fixture)}
+    assert {"test_impact_selection.py", "stub_server.py", "impact_selection.py"} <= files
+    assert "petstore_swagger/petstore_swagger.py" not in files
+
+
+def test_outcome_is_reused_only_while_sources_and_responses_are_unchanged(tmp_path):
+    plugin = ImpactPlugin(StubConfig(tmp_path, StubCache()))
+    nodeid, endpoint = "test_check_pokeapi.py::test_pokemon", "GET https://pokeapi.co/api/v2/pokemon/25/"
+    plugin._sources[nodeid] = {"pokeapi_models.py": "1"}
+    plugin.current_test = nodeid
+    with requests.Session() as session:
+        session.mount("https://", FixedAdapter())
+        plugin.install(session)
+        session.get("https://pokeapi.co/api/v2/pokemon/25/")
+    plugin._record(nodeid, {"outcome": "passed", "duration": 0.1})
+    response = plugin.tests[nodeid]["endpoints"][endpoint]
+    assert plugin._unchanged(nodeid)
+
+    plugin._sources[nodeid] = {"pokeapi_models.py": "2"}
+    assert not plugin._unchanged(nodeid)
+    plugin._sources[nodeid] = {"pokeapi_models.py": "1"}
+    plugin.observe(endpoint, "changed response")
+    assert not plugin._unchanged(nodeid)
+    plugin.endpoints[endpoint] = [response, time.time() - plugin.ttl - 1]
+    assert not plugin._unchanged(nodeid)
+
+
+def test_streamed_responses_expire_with_the_ttl(tmp_path):
+    plugin = ImpactPlugin(StubConfig(tmp_path, StubCache()))
+    nodeid, endpoint = "test_petstore_swagger.py::test_streamed", "GET https://petstore.swagger.io/v2/pet/findByStatus"
+    plugin._sources[nodeid] = {}
+    plugin.current_test = nodeid
+    with requests.Session() as session:
+        session.mount("https://", FixedAdapter())
+        plugin.install(session)
+        session.get("https://petstore.swagger.io/v2/pet/findByStatus", stream=True)
+    plugin._record(nodeid, {"outcome": "passed", "duration": 0.1})
+    assert list(plugin.tests[nodeid]["endpoints"]) == [endpoint]
+    assert plugin._unchanged(nodeid)
+    plugin.endpoints[endpoint][1] = time.time() - plugin.ttl - 1
+    assert not plugin._unchanged(nodeid)
+
+
+def test_stub_server_responses_are_not_fingerprinted(tmp_path):
+    plugin = ImpactPlugin(StubConfig(tmp_path, StubCache()))
+    with StubServer(create_app()) as server, requests.Session() as session:
+        session.mount("http://", ImpactAdapter(plugin, session.get_adapter("http://")))
+        session.get(f"{server.pokeapi_url}/pokemon/1/").raise_for_status()
+    assert plugin.endpoints == {}
+
+
+def test_cache_hits_are_fingerprinted_from_when_they_were_fetched(tmp_path):
+    plugin = ImpactPlugin(StubConfig(tmp_path, StubCache()))
+    nodeid, url = "test_check_pokeapi.py::test_compare_id", "https://pokeapi.co/api/v2/pokemon/27/"
+    cache = ResponseCache()
+    cache.on_hit = plugin.observe_cached
+    with requests.Session() as session:
+        session.mount("https://", FixedAdapter())
+        plugin.install(session)
+        cache.get(session, url)
+        network = plugin.endpoints[f"GET {url}"][0]
+        plugin._sources[nodeid] = {}
+        plugin.current_test = nodeid
+        cache.get(session, url)
+    plugin._record(nodeid, {"outcome": "passed", "duration": 0.1})
+    assert plugin.tests[nodeid]["endpoints"] == {f"GET {url}": network}
+    assert plugin._unchanged(nodeid)
+
+    cache.memory.set(cache.memory.get(url)._replace(fetched_at=time.time() - plugin.ttl - 1))
+    cache.ttl = float("inf")
+    cache.get(session, url)
+    assert not plugin._unchanged(nodeid)
+
+
+def test_outcomes_are_kept_in_the_pytest_cache(tmp_path):
+    cache = StubCache()
+    plugin = ImpactPlugin(StubConfig(tmp_path, cache))
+    plugin._record("test_a.py::test_a", {"outcome": "passed", "duration": 0.1})
+    plugin.pytest_sessionfinish()
+    assert ImpactPlugin(StubConfig(tmp_path, cache)).tests.keys() == {"test_a.py::test_a"}
+    assert list(cache.values) == [CACHE_KEY]
+
+
+def test_runs_without_the_cache_provider(tmp_path):
+    plugin = ImpactPlugin(StubConfig(tmp_path))
+    assert plugin.tests == {}
+    plugin._record("test_a.py::test_a", {"outcome": "passed", "duration": 0.1})
+    plugin.pytest_sessionfinish()
@@ -0,0 +1,34 @@
+import os
+
+from fake_webdriver import FakeDriver
+from page_state import PageStateManager
+
+
+def test_restore_in_place_on_start_page():
+    manager = PageStateManager("https://example.com/", profile_root=None)
+    driver = FakeDriver(current_url="https://example.com")
+    manager.restore(driver)
+    assert driver.scripts and not driver.visits
+    assert manager.in_place_resets == 1
+
+
+def test_restore_reloads_after_navigation():
+    manager = PageStateManager("https://example.com/", profile_root=None)
+    driver = FakeDriver(current_url="https://example.com/product/404")
+    manager.restore(driver)
+    assert driver.visits == ["https://example.com/"] and not driver.scripts
+    assert manager.reloads == 1
+
+
+def test_profiles_are_per_browser(tmp_path):
+    manager = PageStateManager(None, profile_root=str(tmp_path), blocked_resources=["*.png"])
+    first, second = manager.chrome_arguments(0), manager.chrome_arguments(1)
+    assert first != second and first[0].startswith("--user-data-dir=")
+    lock = os.path.join(first[0].split("=", 1)[1], "SingletonLock")
+    os.symlink("crashed-host-1234", lock)  # left behind by a crashed browser
+    assert manager.chrome_arguments(0) == first
+    assert not os.path.lexists(lock)
+    assert PageStateManager(None).chrome_arguments(0) == []
+    driver = FakeDriver()
+    manager.prepare(driver)
+    assert driver.cdp[-1] == ("Network.setBlockedURLs", {"urls": ["*.png"]})
@@ -0,0 +1,61 @@
+import os
+import time
+
+import pytest
+import requests
+from pokeapi_cache import CacheEntry, ResponseCache, SQLiteStore
+
+
+URL = "https://pokeapi.co/api/v2/pokemon/25/"
+
+
+def make_response(status_code: int, content: bytes = b"", headers: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    response.url = URL
+    return response
+
+
+@pytest.fixture
+def session(mocker):
+    return mocker.Mock(spec=requests.Session)
+
+
+def test_fresh_entry_served_from_memory(session):
+    session.get.return_value = make_response(200, b'{"name": "pikachu"}')
+    cache = ResponseCache()
+    assert cache.get(session, URL).json()["name"] == "pikachu"
+    assert cache.get(session, URL).json()["name"] == "pikachu"
+    assert session.get.call_count == 1
+    assert cache.stats == {"hits": 1, "misses": 1, "revalidations": 0}
+
+
+def test_stale_entry_revalidated_with_etag(session, tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.sqlite3"))
+    store.set(CacheEntry(URL, b'{"name": "pikachu"}', '"v1"', None, time.time() - 10))
+    session.get.return_value = make_response(304)
+    cache = ResponseCache(store, ttl=1)
+    assert cache.get(session, URL).json()["name"] == "pikachu"
+    assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert cache.revalidations == 1
+    assert time.time() - store.get(URL).fetched_at < 1
+
+
+def test_errors_are_not_cached(session):
+    session.get.return_value = make_response(404)
+    cache = ResponseCache()
+    with pytest.raises(requests.HTTPError):
+        cache.get(session, URL).raise_for_status()
+    cache.get(session, URL)
+    assert session.get.call_count == 2
+
+
+def test_disk_store_evicts_least_recently_used(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.sqlite3"), max_bytes=2048)
+    payload = os.urandom(1024)  # random bytes do not compress
+    for i in range(5):
+        store.set(CacheEntry(f"{URL}{i}", payload, None, None, time.time()))
+    assert store.get(f"{URL}0") is None
+    assert store.get(f"{URL}4") is not None
@@ -0,0 +1,49 @@
+import pytest
+
+from pokeapi_crawler import CHECKPOINT_EVERY, PokeAPICrawler, crawled_ids, resource_id, sample_ids
+from stub_server import POKEMON_NAMES, StubServer, create_app
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StubServer(create_app()) as server:
+        yield server
+
+
+def test_resource_id():
+    assert resource_id("https://pokeapi.co/api/v2/pokemon/25/") == 25
+    assert resource_id("https://pokeapi.co/api/v2/pokemon-species/10001") == 10001
+
+
+def test_sample_ids_is_deterministic():
+    assert sample_ids(range(1, 1026), 9, seed=1) == sample_ids(list(range(1025, 0, -1)), 9, seed=1)
+    assert sample_ids(range(1, 1026), 9, seed=1) != sample_ids(range(1, 1026), 9, seed=2)
+    assert sample_ids(range(1, 4), 9, seed=1) == [1, 2, 3]
+
+
+def test_crawl_resumes_after_interruption(server, tmp_path):
+    checkpoint = str(tmp_path / "crawl.json")
+    interrupted = PokeAPICrawler(server.pokeapi_url, checkpoint, rate=None, max_workers=4, page_size=40)
+    calls = 0
+    fetch = interrupted._fetch
+
+    def failing_fetch(endpoint, id):
+        nonlocal calls
+        calls += 1
+        if calls > CHECKPOINT_EVERY:
+            raise KeyboardInterrupt
+        fetch(endpoint, id)
+
+    interrupted._fetch = failing_fetch
+    with pytest.raises(KeyboardInterrupt):
+        interrupted.crawl()
+    assert crawled_ids(checkpoint, server.pokeapi_url) is None  # species were never listed
+
+    resumed = PokeAPICrawler(server.pokeapi_url, checkpoint, rate=None, max_workers=4, page_size=40)
+    assert len(resumed.names("pokemon")) == CHECKPOINT_EVERY
+    resumed.crawl()
+    expected = dict(enumerate(POKEMON_NAMES, start=1))
+    assert resumed.names("pokemon") == resumed.names("pokemon-species") == expected
+    assert crawled_ids(checkpoint, server.pokeapi_url) == list(expected)
+    assert crawled_ids(checkpoint, "https://pokeapi.co/api/v2") is None
+
@@ -0,0 +1,23 @@
+import pytest
+from pydantic import ValidationError
+
+from pokeapi_models import MODELS, Pokemon, PokemonSpecies
+
+
+def test_pokemon_validates_from_bytes_and_skips_undeclared_fields():
+    body = (b'{"id": 25, "name": "pikachu", "height": 4, "moves": [{"move": {"name": "thunder"}}],'
+            b' "species": {"name": "pikachu", "url": "https://pokeapi.co/api/v2/pokemon-species/25/"}}')
+    pokemon = Pokemon.model_validate_json(body)
+    assert (pokemon.id, pokemon.name, pokemon.height) == (25, "pikachu", 4)
+    assert pokemon.species.name == "pikachu"
+    assert not hasattr(pokemon, "moves")
+
+
+def test_species_requires_name():
+    with pytest.raises(ValidationError):
+        PokemonSpecies.model_validate_json(b'{"id": 25}')
+
+
+def test_models_by_endpoint():
+    assert MODELS["pokemon"] is Pokemon
+    assert MODELS["pokemon-species"] is PokemonSpecies
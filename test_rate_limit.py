@@ -0,0 +1,125 @@
+import threading
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+
+from rate_limit import AdaptiveConcurrency, RateLimiter, TokenBucket, retry_after_seconds
+from stub_server import StubServer, create_app
+
+
+class ScriptedAdapter(BaseAdapter):
+    """
+    Adapter answering with the given status codes in turn, tracking the peak concurrency.
+    """
+
+    def __init__(self, statuses, retry_after=None, delay=0.0):
+        super().__init__()
+        self.statuses = iter(statuses)
+        self.retry_after = retry_after
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            status = next(self.statuses)
+        time.sleep(self.delay)
+        response = requests.Response()
+        response.status_code = status
+        response.url = request.url
+        if self.retry_after is not None and status == 429:
+            response.headers["Retry-After"] = self.retry_after
+        with self._lock:
+            self.in_flight -= 1
+        return response
+
+    def close(self):
+        pass
+
+
+def scripted_session(adapter):
+    session = requests.Session()
+    session.mount("http://", adapter)
+    return session
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds("2") == 2.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
+
+
+def test_token_bucket_allows_bursts_then_spaces():
+    bucket = TokenBucket(rate=10, burst=3)
+    delays = [bucket.reserve() for _ in range(5)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert 0.05 < delays[3] < delays[4] <= 0.2
+
+
+def test_adaptive_concurrency_is_aimd():
+    concurrency = AdaptiveConcurrency(maximum=8, minimum=1)
+    concurrency.acquire()
+    concurrency.release(congested=True)
+    assert concurrency.limit == 4
+    for _ in range(4):
+        concurrency.acquire()
+        concurrency.release(congested=False)
+    assert 4.9 < concurrency.limit < 5
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = RateLimiter(rate=50)
+    with StubServer(create_app()) as server, requests.Session() as session:
+        limiter.install(session)
+        started = time.perf_counter()
+        for _ in range(6):
+            session.get(f"{server.pokeapi_url}/pokemon/1/")
+        assert time.perf_counter() - started >= 5 / 50
+    [row] = limiter.stats()
+    assert row["requests"] == 6
+    assert row["throttled_s"] > 0
+
+
+def test_rate_limiter_backs_off_on_429_and_retry_after():
+    limiter = RateLimiter(max_concurrency=8)
+    session = scripted_session(ScriptedAdapter([429, 200, 200], retry_after="0.2"))
+    limiter.install(session)
+    assert session.get("http://api.test/pets").status_code == 429
+    started = time.perf_counter()
+    session.get("http://api.test/pets")
+    assert time.perf_counter() - started >= 0.15
+    [row] = limiter.stats()
+    assert row["host"] == "api.test"
+    assert row["congested"] == 1
+    assert row["concurrency_limit"] < 8
+
+
+def test_rate_limiter_caps_concurrency_across_sessions():
+    limiter = RateLimiter(max_concurrency=3)
+    adapter = ScriptedAdapter([200] * 12, delay=0.02)
+    sessions = [scripted_session(adapter) for _ in range(2)]
+    for session in sessions:
+        limiter.install(session)
+    threads = [threading.Thread(target=sessions[i % 2].get, args=("http://api.test/pets",)) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert adapter.peak == 3
+
+
+def test_rate_limiters_chain_on_one_session():
+    shared, own = RateLimiter(max_concurrency=4), RateLimiter(max_concurrency=4)
+    session = scripted_session(ScriptedAdapter([200] * 2))
+    shared.install(session)
+    own.install(session)
+    own.install(session)
+    shared.install(session)
+    session.get("http://api.test/pets")
+    session.get("http://api.test/pets")
+    assert [row["requests"] for row in shared.stats() + own.stats()] == [2, 2]
@@ -1,53 +1,63 @@
 import pytest
-from selenium import webdriver
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 
 
-@pytest.fixture(scope="module")
-def setup():
+SITE_URL = "https://www.canadadealsonline.com/"
+SEARCH_TERMS = ["Keyboard", "Shower Carpet", "Air Fryer"]
+SEARCH_INPUT_XPATH = "//input[@placeholder='Search']"
+
+
+@pytest.fixture(scope="session")
+def browser_start_url():
+    return SITE_URL
+
+
+@pytest.fixture
+def setup(browser_engine):
     """
-        Fixture to set up a WebDriver instance for testing the Canada Deals Online website.
+        Fixture to lease a browser page for testing the Canada Deals Online website.
 
-        This fixture launches a Chrome WebDriver, maximizes the window, navigates to the
-        Canada Deals Online website, and sets up implicit wait for the driver.
+        The page comes from the session-wide `browser_engine` selected with `--browser-engine`:
+        a pooled Selenium Chrome (the default) or a Playwright browser context. It already sits
+        on the Canada Deals Online website, and after the test it is restored or discarded
+        instead of relaunching a browser. Run with `--browsers N` to keep N pages busy in parallel.
 
         Yields:
-            WebDriver: An instance of the WebDriver set up for testing the website.
+            SeleniumPage | PlaywrightPage: A page set up for testing the website.
 
         Example:
-            This fixture can be used in PyTest tests to obtain a WebDriver instance for
+            This fixture can be used in PyTest tests to obtain a page for
             interacting with the Canada Deals Online website. For example:
 
             ```
-            def test_website_title(setup):
-                driver = setup
-                assert driver.title == "Canada Deals Online - Save more. Smile more."
+            def test_website_url(setup):
+                page = setup
+                assert "canadadealsonline" in page.current_url
             ```
         """
-    chrome_options = Options()
-    # chrome_options.headless = False
-    chrome_options.add_argument("--headless")  # start Chrome in headless mode
-    chrome_options.add_argument("--no-sandbox")
-    driver = webdriver.Chrome(chrome_options)
-    # driver.maximize_window()
-    driver.get("https://www.canadadealsonline.com/")
-    driver.implicitly_wait(10)
-    yield driver
-    driver.quit()
+    with browser_engine.lease() as page:
+        yield page
+
+
+def search_dropdown(page, search_term: str, result_text: str, min_count: int = 1) -> list:
+    """
+        Fills the search box with `search_term` and waits for `min_count` dropdown results containing `result_text`.
+    """
+    page.fill(SEARCH_INPUT_XPATH, search_term)
+    return page.elements(f"//span[contains(@class, 'text-blue-400') and contains(text(), '{result_text}')]",
+                         min_count=min_count)
 
 
 def fill_search_box(setup, search_term: str):
     """
         Function to fill the search box on the Canada Deals Online website and verify the dropdown results.
 
-        This function takes a WebDriver instance `setup` and a search term `search_term` as input.
+        This function takes a page `setup` and a search term `search_term` as input.
         It fills the search input field with the provided search term, waits for the dropdown results to appear,
         and then verifies that there are at least two search results in the dropdown.
 
         Args:
-            setup (WebDriver): The WebDriver instance set up for testing the website.
+            setup (SeleniumPage | PlaywrightPage): The page set up for testing the website.
             search_term (str): The search term to enter into the search input field.
 
         Raises:
@@ -62,111 +72,119 @@ def fill_search_box(setup, search_term: str):
                 fill_search_box(setup, "Keyboard")
             ```
         """
-    driver = setup
+    page = setup
     try:
-        search_input = driver.find_element(By.XPATH, "//input[@placeholder='Search']")
-        search_input.send_keys(search_term)
-        driver.implicitly_wait(10)
-        dropdown_results = driver.find_elements(By.XPATH,
-                                                "//span[contains(@class, 'text-blue-400') and contains(text(), 'keyboard')]")
+        dropdown_results = search_dropdown(page, search_term, "keyboard", min_count=2)
         assert len(dropdown_results) > 1, f"Test case 1 failed: {search_term} has less than 2 search results"
     except NoSuchElementException:
         print("Element not found.")
 
 
-@pytest.mark.parametrize("search_term", ["Keyboard", "Shower Carpet", "Air Fryer"])
-def test_search_box_more_than_one_result(setup, search_term: str):
+def count_dropdown_results(page, search_term: str) -> int | None:
+    """
+        Counts the dropdown results of `search_term`, None if the search box is missing.
+    """
+    try:
+        return len(search_dropdown(page, search_term, "keyboard", min_count=2))
+    except NoSuchElementException:
+        return None
+
+
+def third_result_text(page, search_term: str) -> str | None:
+    """
+        Text of the third dropdown result containing `search_term`, None if the search box is missing.
+    """
+    try:
+        text = search_dropdown(page, search_term, search_term.lower(), min_count=3)[2].text
+        page.clear(SEARCH_INPUT_XPATH)
+        return text
+    except NoSuchElementException:
+        return None
+
+
+@pytest.fixture(scope="module")
+def dropdown_result_counts(browser_engine):
+    """
+        Searches every term of SEARCH_TERMS at once, one leased page per term (see `--browsers`).
+
+        Returns:
+            dict: Search term -> number of dropdown results, None if the search box was not found.
+        """
+    return dict(zip(SEARCH_TERMS, browser_engine.map(count_dropdown_results, SEARCH_TERMS)))
+
+
+@pytest.fixture(scope="module")
+def third_result_texts(browser_engine):
+    """
+        Searches every term of SEARCH_TERMS at once, one leased page per term (see `--browsers`).
+
+        Returns:
+            dict: Search term -> text of its third dropdown result, None if the search box was not found.
+        """
+    return dict(zip(SEARCH_TERMS, browser_engine.map(third_result_text, SEARCH_TERMS)))
+
+
+@pytest.mark.parametrize("search_term", SEARCH_TERMS)
+def test_search_box_more_than_one_result(dropdown_result_counts, search_term: str):
     """
         Test function to verify that the search box on the Canada Deals Online website returns more than one result.
 
-        This test function takes a search term as input and fills the search input field with the provided term.
-        It then waits for the dropdown results to appear and verifies that there are more than one search results in the dropdown.
+        The searches of all the parametrized terms run in parallel through the browser engine when the first
+        case needs them (see the `dropdown_result_counts` fixture), every case then checks its own term.
 
         Args:
-            setup (WebDriver): The WebDriver instance set up for testing the website.
-            search_term (str): The search term to enter into the search input field.
+            dropdown_result_counts (dict): Search term -> number of dropdown results.
+            search_term (str): The search term entered into the search input field.
 
         Raises:
             AssertionError: If less than two search results are found in the dropdown.
-
-        Example:
-            This function can be used in PyTest tests to verify that the search box returns more than one result
-            for different search terms. For example:
-
-            ```
-            def test_search_results(setup):
-                test_search_box_more_than_one_result(setup, "Shower Curtain")
-            ```
         """
-    driver = setup
-    try:
-        search_input = driver.find_element(By.XPATH, "//input[@placeholder='Search']")
-        search_input.clear()
-        search_input.send_keys(search_term)
-        driver.implicitly_wait(10)
-        dropdown_results = driver.find_elements(By.XPATH,
-                                                "//span[contains(@class, 'text-blue-400') and contains(text(), 'keyboard')]")
-        assert len(dropdown_results) > 1, f"Test case 1 failed: {search_term} has less than 2 search results"
-        search_input.clear()
-    except NoSuchElementException:
+    count = dropdown_result_counts[search_term]
+    if count is None:
         print("Element not found.")
+        return
+    assert count > 1, f"Test case 1 failed: {search_term} has less than 2 search results"
 
 
-@pytest.mark.parametrize("search_term", ["Keyboard", "Shower Carpet", "Air Fryer"])
-def test_search_box_appears_in_three_top_result(setup, search_term: str):
+@pytest.mark.parametrize("search_term", SEARCH_TERMS)
+def test_search_box_appears_in_three_top_result(third_result_texts, search_term: str):
     """
         Test function to verify that the search term appears in the top three search results on the Canada Deals Online website.
 
-        This test function takes a search term as input and fills the search input field with the provided term.
-        It then waits for the dropdown results to appear and verifies that the search term appears in the text of
-        the top three search results in the dropdown.
+        The searches of all the parametrized terms run in parallel through the browser engine when the first
+        case needs them (see the `third_result_texts` fixture), every case then checks the third dropdown
+        result of its own term.
 
         Args:
-            setup (WebDriver): The WebDriver instance set up for testing the website.
-            search_term (str): The search term to enter into the search input field.
+            third_result_texts (dict): Search term -> text of its third dropdown result.
+            search_term (str): The search term entered into the search input field.
 
         Raises:
             AssertionError: If the search term does not appear in the text of the top three search results.
-
-        Example:
-            This function can be used in PyTest tests to verify that the search term appears in the top three search results
-            for different search terms. For example:
-
-            ```
-            def test_search_results(setup):
-                test_search_box_appears_in_three_top_result(setup, "Shower Curtain")
-            ```
         """
-    driver = setup
-    try:
-        search_input = driver.find_element(By.XPATH, "//input[@placeholder='Search']")
-        search_input.clear()
-        search_input.send_keys(search_term)
-        driver.implicitly_wait(10)
-        # Update XPath expression to include the search term
-        dropdown_results = driver.find_elements(By.XPATH,
-                                                f"//span[contains(@class, 'text-blue-400') and contains(text(), '{search_term.lower()}')]")
-        third_result_text = dropdown_results[2].text
-        assert search_term.lower() in third_result_text.lower(), f"Test case failed: {search_term} not found in top search result"
-        search_input.clear()
-    except NoSuchElementException:
+    text = third_result_texts[search_term]
+    if text is None:
         print("Element not found.")
+        return
+    assert search_term.lower() in text.lower(), f"Test case failed: {search_term} not found in top search result"
 
 
 def test_search_box_no_appears_http_404_not_found_errors(setup):
     """
         Test function to verify that clicking on a search result does not lead to a 404 Not Found error.
 
-        This test function takes a WebDriver instance set up for testing the website. It fills the search input field
+        This test function takes a page set up for testing the website. It fills the search input field
         with a predefined search term, clicks on the first search result, and checks if the current URL contains "404".
         If a 404 page is found, an AssertionError is raised.
 
         Args:
-            setup (WebDriver): The WebDriver instance set up for testing the website.
+            setup (SeleniumPage | PlaywrightPage): The page set up for testing the website.
 
         Raises:
             AssertionError: If a 404 page is found after clicking on a search result.
 
+        A single search, so it leases one page through `setup` instead of going through `browser_engine.map`.
+
         Example:
             This function can be used in PyTest tests to verify that clicking on a search result does not lead
             to a 404 Not Found error. For example:
@@ -176,17 +194,14 @@ def test_search_box_no_appears_http_404_not_found_errors(setup):
                 test_search_box_no_appears_http_404_not_found_errors(setup)
             ```
         """
-    driver = setup
+    page = setup
     search_term = "Keyboard"
     try:
-        search_input = driver.find_element(By.XPATH, "//input[@placeholder='Search']")
-        search_input.send_keys(search_term)
-        # Update XPath expression to include the search term
-        dropdown_results = driver.find_elements(By.XPATH,
-                                                f"//span[contains(@class, 'text-blue-400') and contains(text(), 'keyboard')]")
+        dropdown_results = search_dropdown(page, search_term, "keyboard")
+        search_page_url = page.current_url
         dropdown_results[0].click()
-        driver.implicitly_wait(10)
+        page.wait_for_url_change(search_page_url)
         # Check if the URL contains "404"
-        assert "404" not in driver.current_url, f"Test case failed: 404 page found after clicking on search result for {search_term}"
+        assert "404" not in page.current_url, f"Test case failed: 404 page found after clicking on search result for {search_term}"
     except NoSuchElementException:
         print("Element not found.")
@@ -0,0 +1,65 @@
+import time
+
+import requests
+from stub_server import POKEMON_NAMES, StubServer, create_app
+
+
+def test_petstore_routes():
+    pet = {"id": 1001, "name": "Spot", "photoUrls": [], "status": "available"}
+    with StubServer(create_app()) as server, requests.Session() as session:
+        url = server.petstore_url
+        assert session.post(f"{url}/pet", json=pet).json() == pet
+        assert session.post(f"{url}/pet", json={**pet, "id": "x"}).status_code == 405
+        assert [p["name"] for p in session.get(f"{url}/pet/findByStatus", params={"status": "available"}).json()] \
+            == ["doggie", "Rex", "Bella", "Puff", "Spot"]
+        assert session.put(f"{url}/pet", json={"id": 1001, "status": "sold"}).json() == {**pet, "status": "sold"}
+        assert session.put(f"{url}/pet", json={"status": "sold"}).status_code == 400
+        sold = session.get(f"{url}/pet/findByStatus", params={"status": ["pending", "sold"]}).json()
+        assert [p["name"] for p in sold] == ["Nemo", "Max", "Luna", "Spot"]
+        assert session.get(f"{url}/pet/findByStatus", params={"status": "lost"}).status_code == 400
+        assert session.get(f"{url}/pet/1001").json()["status"] == "sold"
+        assert session.delete(f"{url}/pet/1001").json()["message"] == "1001"
+        assert session.get(f"{url}/pet/1001").status_code == 404
+        assert session.delete(f"{url}/pet/1001").status_code == 404
+
+
+def test_pokeapi_routes():
+    with StubServer(create_app()) as server, requests.Session() as session:
+        url = server.pokeapi_url
+        pikachu = session.get(f"{url}/pokemon/25/").json()
+        assert pikachu["name"] == "pikachu"
+        assert session.get(f"{url}/pokemon/pikachu/").json() == pikachu
+        assert session.get(pikachu["species"]["url"].replace("/api/v2", url, 1)).json() == \
+            {"id": 25, "name": "pikachu"}
+        assert session.get(f"{url}/pokemon/0/").status_code == 404
+        assert session.get(f"{url}/pokemon-species/missingno/").status_code == 404
+
+        first = session.get(f"{url}/pokemon/", params={"limit": 100}).json()
+        assert first["count"] == len(POKEMON_NAMES) and first["previous"] is None
+        assert [r["name"] for r in first["results"]] == POKEMON_NAMES[:100]
+        last = session.get(first["next"]).json()
+        assert [r["name"] for r in last["results"]] == POKEMON_NAMES[100:]
+        assert last["next"] is None and last["previous"] == f"{url}/pokemon/?offset=0&limit=100"
+        species = session.get(f"{url}/pokemon-species/", params={"limit": 1, "offset": 150}).json()
+        assert species["results"] == [{"name": "mew", "url": f"{url}/pokemon-species/151/"}]
+
+        assert 'placeholder="Search"' in session.get(f"{server.url}/web/search").text
+        assert "<h1>mew</h1>" in session.get(f"{server.url}/web/pokemon/mew").text
+
+
+def test_latency_is_added_to_every_response():
+    with StubServer(create_app(latency=0.05)) as server, requests.Session() as session:
+        for _ in range(3):
+            start = time.perf_counter()
+            session.get(f"{server.pokeapi_url}/pokemon/1/").raise_for_status()
+            assert time.perf_counter() - start >= 0.05
+
+
+def test_injected_error_rate():
+    with StubServer(create_app(error_rate=0.3, seed=1234)) as server, requests.Session() as session:
+        statuses = [session.get(f"{server.pokeapi_url}/pokemon/1/").status_code for _ in range(400)]
+    assert set(statuses) == {200, 503}
+    assert 0.2 < statuses.count(503) / len(statuses) < 0.4
+
+    with StubServer(create_app(error_rate=0.0)) as server, requests.Session() as session:
+        assert all(session.get(f"{server.petstore_url}/pet/1").ok for _ in range(50))
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from fake_webdriver import FakeDriver
+from webdriver_pool import WebDriverPool
+
+
+def test_pool_reuses_and_resets_browsers():
+    launched = []
+
+    def factory(worker):
+        launched.append(FakeDriver(worker))
+        return launched[-1]
+
+    pool = WebDriverPool(factory, size=2, start_url="https://example.com/")
+    for _ in range(5):
+        with pool.lease() as driver:
+            driver.get("https://example.com/other")
+    pool.close()
+    assert len(launched) == 2
+    assert all(driver.quit_called for driver in launched)
+    assert sum(row["leases"] for row in pool.utilization()) == 5
+    assert all(driver.visits[-1] == "https://example.com/" for driver in launched)
+    assert sorted(driver.worker for driver in launched) == [0, 1]
+
+
+def test_pool_uses_custom_restore():
+    restored = []
+    pool = WebDriverPool(FakeDriver, size=1, start_url="https://example.com/", restore=restored.append)
+    with pool.lease() as driver:
+        pass
+    pool.close()
+    assert restored == [driver]
+    assert driver.visits == ["https://example.com/"]
+
+
+def test_pool_relaunches_broken_browser():
+    pool = WebDriverPool(FakeDriver, size=1, start_url="https://example.com/")
+    with pool.lease() as driver:
+        driver.broken = True
+    with pool.lease() as replacement:
+        assert replacement is not driver
+    pool.close()
+    assert pool.utilization()[0]["relaunches"] == 1
+
+
+def test_pool_lease_fails_instead_of_hanging_when_relaunch_fails():
+    launches = []
+
+    def factory(worker):
+        if launches and launches[-1] == "fail":
+            raise WebDriverException("cannot start browser")
+        launches.append("ok")
+        return FakeDriver(worker)
+
+    pool = WebDriverPool(factory, size=1, start_url="https://example.com/")
+    launches.append("fail")
+    with pool.lease() as driver:
+        driver.broken = True
+    with pytest.raises(WebDriverException, match="cannot start browser"):
+        with pool.lease(timeout=5):
+            pass
+    launches.append("ok")  # the browser can be started again
+    with pool.lease(timeout=5) as replacement:
+        assert replacement is not driver
+    pool.close()
+
+
+def test_pool_lease_times_out():
+    pool = WebDriverPool(FakeDriver, size=1)
+    with pool.lease():
+        with pytest.raises(TimeoutError):
+            with pool.lease(timeout=0.05):
+                pass
+    pool.close()
+
+
+def test_pool_map_runs_in_parallel():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(driver, item):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return item * 2
+
+    pool = WebDriverPool(FakeDriver, size=3)
+    assert pool.map(work, range(6)) == [0, 2, 4, 6, 8, 10]
+    pool.close()
+    assert peak == 3
@@ -0,0 +1,141 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+DEFAULT_LEASE_TIMEOUT = 300.0  # seconds a test waits for an idle browser before failing
+
+
+class WebDriverPool:
+    """
+    Pool of pre-launched WebDriver instances leased to tests.
+
+    Browsers are started in parallel when the pool is created. When a lease ends the
+    browser is reset in the background (extra windows closed, start page restored)
+    instead of being relaunched, and goes back to the idle queue. A browser that fails
+    to reset is replaced by a fresh one; if that launch fails too, the next lease of
+    that slot launches it again and raises the error if it still fails.
+    """
+
+    def __init__(self, factory, size: int = 1, start_url: str | None = None, restore=None):
+        """
+        :param factory: Callable taking the browser index (0..size-1) and returning a new WebDriver.
+        :param size: Number of browsers to keep running.
+        :param start_url: Page every browser is on when it is leased.
+        :param restore: Callable bringing a used browser back to the start page,
+                        reloads `start_url` by default.
+        """
+        self._factory = factory
+        self.size = size
+        self.start_url = start_url
+        self._restore = restore or self._reload
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._resets = ThreadPoolExecutor(max_workers=size, thread_name_prefix="webdriver-reset")
+        self.stats = {}
+        self.started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=size) as launcher:
+            for worker, driver in enumerate(launcher.map(self._launch, range(size))):
+                self.stats[worker] = {"worker": worker, "leases": 0, "busy_s": 0.0, "relaunches": 0}
+                self._idle.put((worker, driver))
+
+    def _launch(self, worker: int):
+        driver = self._factory(worker)
+        if self.start_url:
+            driver.get(self.start_url)
+        return driver
+
+    def _reload(self, driver):
+        if self.start_url:
+            driver.get(self.start_url)
+
+    def _relaunch(self, worker: int):
+        driver = self._launch(worker)
+        with self._lock:
+            self.stats[worker]["relaunches"] += 1
+        return driver
+
+    def _reset(self, worker: int, driver):
+        # Runs on the reset executor, where exceptions would be lost: the slot always goes back
+        # to the idle queue, without a browser (None) if it could not be relaunched
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            self._restore(driver)
+        except Exception:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            try:
+                driver = self._relaunch(worker)
+            except Exception:
+                driver = None
+        finally:
+            self._idle.put((worker, driver))
+
+    @contextmanager
+    def lease(self, timeout: float | None = DEFAULT_LEASE_TIMEOUT):
+        """
+        Borrow an idle browser for the duration of the `with` block.
+
+        :param timeout: Seconds to wait for an idle browser, None to wait forever.
+        :raises TimeoutError: No browser became idle within `timeout`.
+        """
+        try:
+            worker, driver = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No idle browser within {timeout} s (pool of {self.size})") from None
+        if driver is None:
+            try:
+                driver = self._relaunch(worker)
+            except Exception:
+                self._idle.put((worker, None))
+                raise
+        started = time.perf_counter()
+        try:
+            yield driver
+        finally:
+            with self._lock:
+                self.stats[worker]["leases"] += 1
+                self.stats[worker]["busy_s"] += time.perf_counter() - started
+            self._resets.submit(self._reset, worker, driver)
+
+    def map(self, func, items) -> list:
+        """
+        Run `func(driver, item)` for every item in parallel, one leased browser per call.
+
+        :return: The results in the order of `items`.
+        """
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="webdriver") as executor:
+            def run(item):
+                with self.lease() as driver:
+                    return func(driver, item)
+
+            return list(executor.map(run, items))
+
+    def utilization(self) -> list[dict]:
+        """
+        :return: Per browser lease count, busy time and share of the pool lifetime spent leased.
+        """
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            return [dict(stats, utilization=stats["busy_s"] / elapsed if elapsed else 0.0)
+                    for stats in self.stats.values()]
+
+    def close(self):
+        self._resets.shutdown(wait=True)
+        while not self._idle.empty():
+            _, driver = self._idle.get_nowait()
+            if driver is None:
+                continue
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass